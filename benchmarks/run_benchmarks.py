@@ -0,0 +1,439 @@
+"""Time the dashboards, aggregators and power ranking on synthetic data.
+
+Usage::
+
+    python -m benchmarks.run_benchmarks --sizes 1 100 10000 --output results.json
+    python -m benchmarks.run_benchmarks --filter dashboard --compare previous.json
+
+`size` is the number of synthetic matches a case runs on.  Dashboard cases also
+report the number of matplotlib artists in the rendered figure.  Remote images and team
+colours are replaced with blank placeholders so timings do not include network
+round trips.  Results are written as JSON, tagged with the fb_viz version, so
+runs from different releases can be compared with ``--compare``.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import re
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+from unittest import mock
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+from PIL import Image  # noqa: E402
+
+from benchmarks import synthetic  # noqa: E402
+
+DEFAULT_SIZES = [1, 100, 10000]
+
+
+@dataclass
+class Case:
+    name: str
+    run: Callable[["Fixtures", int], Optional[int]]
+    sizes: Sequence[int] = (1,)
+    repeat: int = 3
+
+
+@dataclass
+class Result:
+    name: str
+    size: int
+    repeat: int
+    min: float
+    median: float
+    mean: float
+    error: Optional[str] = None
+    artists: Optional[int] = None
+
+
+CASES: List[Case] = []
+
+
+def case(name: str, sizes: Sequence[int] = (1,), repeat: int = 3):
+    def decorator(f):
+        CASES.append(Case(name, f, sizes, repeat))
+        return f
+
+    return decorator
+
+
+class Fixtures:
+    """Synthetic frames per size, generated lazily and shared between cases"""
+
+    def __init__(self, seed: int = 0):
+        self.seed = seed
+        self._cache: Dict = {}
+
+    def _get(self, key, factory):
+        if key not in self._cache:
+            self._cache[key] = factory()
+        return self._cache[key]
+
+    def events(self, n_matches: int):
+        return self._get(
+            ("events", n_matches),
+            lambda: synthetic.generate_events(n_matches, self.seed),
+        )
+
+    def connection(self, n_matches: int = 1):
+        return self._get(
+            ("connection", n_matches),
+            lambda: synthetic.SyntheticConnection(self.events(n_matches)),
+        )
+
+    def bundle(self):
+        from fb_viz.helpers.match_bundle import MatchBundle
+
+        conn = self.connection(1)
+        return MatchBundle.load(conn, int(conn.events["matchId"].iloc[0]))
+
+    def power_rank_data(self, n_matches: int):
+        return self._get(
+            ("power_rank", n_matches),
+            lambda: synthetic.generate_power_rank_data(n_matches, self.seed),
+        )
+
+
+@contextmanager
+def offline_assets():
+    """Blank placeholder images and default colours instead of remote lookups"""
+    from fb_viz.helpers.image_cache import image_cache
+    from fb_viz.helpers.team_colour_helpers import colour_service
+
+    blank = Image.new("RGBA", (200, 200))
+    with mock.patch.object(
+        image_cache, "get", lambda *args, **kwargs: blank
+    ), mock.patch.object(colour_service, "get", lambda *args, **kwargs: None):
+        yield
+
+
+def _count_artists(fig) -> int:
+    return len(fig.get_children()) + sum(len(ax.get_children()) for ax in fig.axes)
+
+
+def _render(dashboard: str, fixtures: "Fixtures", **init_kwargs):
+    from fb_viz.batch import RenderJob, render_figure, resolve_dashboard
+
+    bundle = fixtures.bundle()
+    job = RenderJob(
+        dashboard,
+        match_id=bundle.match_id,
+        team=bundle.home_team,
+        init_kwargs=init_kwargs,
+    )
+    fig = render_figure(
+        resolve_dashboard(dashboard), job, fixtures.connection(1), bundle
+    )
+    plt.close(fig)
+    return _count_artists(fig)
+
+
+for _name in [
+    "PassingDashboard",
+    "DefensiveDashboard",
+    "PassNetworkDashboard",
+    "MatchSummaryDashboard",
+    "HBRProgressiveDistance",
+    "HBRExpectedGoalContributions",
+    "HBRChanceCreation",
+    "HBRDuels",
+]:
+    case(f"dashboard.{_name}")(lambda f, n, _name=_name: _render(_name, f))
+
+for _name in ["GroundDuelsPitchArea", "TouchesPitchArea"]:
+    case(f"dashboard.{_name}")(
+        lambda f, n, _name=_name: _render(_name, f, home_color="red", away_color="blue")
+    )
+
+
+@case("dashboard.TeamOfTheWeek")
+def _team_of_the_week(fixtures: Fixtures, n: int):
+    from fb_viz.dashboards.totw import TeamOfTheWeek
+
+    totw, baseline = synthetic.generate_team_of_the_week(fixtures.seed)
+    conn = synthetic.SyntheticConnection(
+        fixtures.events(1),
+        tables={"team_of_the": totw, "fbref_power_ranking_new": baseline},
+    )
+    fig = TeamOfTheWeek(conn).draw(7, "Premier League", 2023)
+    plt.close(fig)
+    return _count_artists(fig)
+
+
+@case("dashboard.ScatterPlot")
+def _scatter_plot(fixtures: Fixtures, n: int):
+    from fb_viz.dashboards.scatterplot import ScatterPlot
+
+    data = synthetic.generate_player_season_stats(500, fixtures.seed)
+    fig = ScatterPlot.draw(data, "npxG vs xA", "npxg_per90", "xa_per90")
+    plt.close(fig)
+    return _count_artists(fig)
+
+
+def _draw_passes_with_pitch_lines(ax, data, pitch, linewidth: float = 3):
+    """`draw_passes_on_axes` as it was before it built its own LineCollections: one
+    `pitch.lines` call per pass category and outcome, kept as a baseline"""
+    from fb_viz.helpers.data_helpers import attach_passtypes
+    from fb_viz.helpers.pitch_helpers import PASS_LINE_COLORS, pass_category_codes
+    from fb_viz.helpers.qualifiers import has_qualifier
+    from footmav.data_definitions.whoscored.constants import EventType
+
+    attach_passtypes(data)
+    passes = data.loc[
+        (data["event_type"] == EventType.Pass)
+        & (~has_qualifier(data, qualifier_code=107))
+    ]
+    categories = pass_category_codes(passes)
+    for outcome, kwargs in [(1, dict(zorder=3)), (0, dict(alpha=0.6))]:
+        for category, color in enumerate(PASS_LINE_COLORS[outcome]):
+            drawn = passes.loc[
+                (passes["outcomeType"].values == outcome) & (categories == category)
+            ]
+            if drawn.shape[0] > 0:
+                pitch.lines(
+                    drawn["x"],
+                    drawn["y"],
+                    drawn["endX"],
+                    drawn["endY"],
+                    lw=linewidth,
+                    transparent=True,
+                    comet=True,
+                    capstyle="round",
+                    color=color,
+                    ax=ax,
+                    **kwargs,
+                )
+
+
+@case("dashboard.PassingDashboard.pitch_lines")
+def _passing_dashboard_pitch_lines(fixtures: Fixtures, n: int):
+    """dashboard.PassingDashboard drawn with the previous `draw_passes_on_axes`, for a
+    before/after comparison of its passing panels"""
+    with mock.patch(
+        "fb_viz.dashboards.passing_dashboard.draw_passes_on_axes",
+        _draw_passes_with_pitch_lines,
+    ):
+        return _render("PassingDashboard", fixtures)
+
+
+def _hull_outlier_case(strategy: str):
+    def run(fixtures: Fixtures, n: int):
+        from fb_viz.helpers.outliers import get_outlier_strategy
+
+        inliers = get_outlier_strategy(strategy)
+        data = fixtures.events(n)
+        for _, player in data.groupby(["matchId", "player_name"]):
+            xy = player[["x", "y"]].to_numpy(dtype=float)
+            if len(xy) > 4:
+                inliers(xy, 0.1)
+
+    return run
+
+
+for _name in ["mahalanobis", "isolation_forest"]:
+    case(f"outliers.{_name}", sizes=(1, 100))(_hull_outlier_case(_name))
+
+
+def _aggregator_case(name: str):
+    def run(fixtures: Fixtures, n: int):
+        from fb_viz.helpers import aggregators
+
+        getattr(aggregators, name)(fixtures.events(n))
+
+    return run
+
+
+for _name in [
+    "progressive_pass_distance",
+    "progressive_carry_distance",
+    "open_play_passes_completed_into_the_box",
+    "crosses_completed_into_the_box",
+    "carries_into_the_box",
+]:
+    case(f"aggregators.{_name}", sizes=DEFAULT_SIZES)(_aggregator_case(_name))
+
+
+@case("qualifiers.attach_qualifier_flags", sizes=DEFAULT_SIZES)
+def _attach_qualifier_flags(fixtures: Fixtures, n: int):
+    from fb_viz.helpers.qualifiers import attach_qualifier_flags
+
+    attach_qualifier_flags(fixtures.events(n)[["qualifiers"]].copy())
+
+
+@case("possession.possession_durations", sizes=DEFAULT_SIZES)
+def _possession_durations(fixtures: Fixtures, n: int):
+    from fb_viz.helpers.possession import possession_durations
+
+    possession_durations(fixtures.events(n))
+
+
+@case("powerrank.create_rank", sizes=DEFAULT_SIZES)
+def _create_rank(fixtures: Fixtures, n: int):
+    from fb_viz.tables.powerranking import PowerRank
+
+    PowerRank(fixtures.connection(1)).create_rank(
+        fixtures.power_rank_data(n).copy(), "total"
+    )
+
+
+@case("powerrank.create_player_rank", sizes=DEFAULT_SIZES)
+def _create_player_rank(fixtures: Fixtures, n: int):
+    from fb_viz.tables.powerranking import PowerRank
+
+    PowerRank(fixtures.connection(1)).create_player_rank(
+        fixtures.power_rank_data(n).copy(), "total"
+    )
+
+
+@case("powerrank.create_ranks", sizes=DEFAULT_SIZES)
+def _create_ranks(fixtures: Fixtures, n: int):
+    from fb_viz.tables.powerranking import PowerRank
+
+    PowerRank(fixtures.connection(1)).create_ranks(fixtures.power_rank_data(n).copy())
+
+
+@case("powerrank.html", sizes=DEFAULT_SIZES)
+def _powerrank_html(fixtures: Fixtures, n: int):
+    from fb_viz.tables.powerrank_html import PowerRankHtml
+    from fb_viz.tables.powerranking import PowerRank
+
+    ranked = PowerRank(fixtures.connection(1)).create_rank(
+        fixtures.power_rank_data(n).copy(), "total"
+    )
+    PowerRankHtml(num_games=5).render(ranked)
+
+
+@case("style.background_gradient_from_another_column", sizes=DEFAULT_SIZES)
+def _background_gradient(fixtures: Fixtures, n: int):
+    from fb_viz.helpers.dataframe_style_helpers import (
+        background_gradient_from_another_column,
+    )
+
+    data = fixtures.power_rank_data(n)
+    for metric in ["defending", "finishing", "progressing", "providing", "total"]:
+        background_gradient_from_another_column(data, data[metric], cmap="RdYlGn")
+
+
+def run_case(c: Case, fixtures: Fixtures, size: int, repeat: int = None) -> Result:
+    repeat = repeat or c.repeat
+    try:
+        # the first call also generates the fixtures, so it is not timed
+        c.run(fixtures, size)
+        timings = []
+        for _ in range(repeat):
+            gc.collect()
+            start = time.perf_counter()
+            artists = c.run(fixtures, size)
+            timings.append(time.perf_counter() - start)
+    except Exception as e:
+        return Result(c.name, size, repeat, 0, 0, 0, f"{type(e).__name__}: {e}")
+    return Result(
+        c.name,
+        size,
+        repeat,
+        min(timings),
+        statistics.median(timings),
+        statistics.mean(timings),
+        artists=artists,
+    )
+
+
+def run(
+    name_filter: str = None,
+    sizes: Sequence[int] = None,
+    repeat: int = None,
+    seed: int = 0,
+) -> List[Result]:
+    fixtures = Fixtures(seed)
+    results = []
+    with offline_assets():
+        for c in CASES:
+            if name_filter and not re.search(name_filter, c.name):
+                continue
+            for size in c.sizes:
+                if sizes and size not in sizes:
+                    continue
+                result = run_case(c, fixtures, size, repeat)
+                print(_format_result(result), flush=True)
+                results.append(result)
+    return results
+
+
+def _format_result(r: Result) -> str:
+    if r.error:
+        return f"{r.name:<50} {r.size:>6}  FAILED {r.error}"
+    artists = f"  {r.artists:>7} artists" if r.artists is not None else ""
+    return f"{r.name:<50} {r.size:>6}  {r.median * 1000:10.1f} ms{artists}"
+
+
+def compare(results: List[Result], previous_path: str, threshold: float = 1.1) -> str:
+    with open(previous_path) as fp:
+        previous = {(r["name"], r["size"]): r for r in json.load(fp)["results"]}
+    lines = []
+    for r in results:
+        before = previous.get((r.name, r.size))
+        if r.error or before is None or before.get("error") or not before["median"]:
+            continue
+        ratio = r.median / before["median"]
+        flag = "  REGRESSION" if ratio > threshold else ""
+        artists = ""
+        if r.artists is not None and before.get("artists") is not None:
+            artists = f"  artists {before['artists']} -> {r.artists}"
+        lines.append(f"{r.name:<50} {r.size:>6}  x{ratio:5.2f}{flag}{artists}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    from fb_viz.version import __version__
+
+    parser = argparse.ArgumentParser(description="Run the fb_viz benchmarks")
+    parser.add_argument("--filter", default=None, help="regex on case names")
+    parser.add_argument("--sizes", type=int, nargs="*", default=None)
+    parser.add_argument("--repeat", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="results file, defaults to benchmarks/results/<version>-<time>.json",
+    )
+    parser.add_argument("--compare", default=None, help="earlier results file")
+    args = parser.parse_args(argv)
+
+    results = run(args.filter, args.sizes, args.repeat, args.seed)
+    output = args.output or os.path.join(
+        os.path.dirname(__file__),
+        "results",
+        f"{__version__}-{time.strftime('%Y%m%d-%H%M%S')}.json",
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as fp:
+        json.dump(
+            dict(
+                version=__version__,
+                created=time.strftime("%Y-%m-%dT%H:%M:%S"),
+                python=sys.version.split()[0],
+                platform=platform.platform(),
+                seed=args.seed,
+                results=[asdict(r) for r in results],
+            ),
+            fp,
+            indent=2,
+        )
+    print(f"\nwrote {output}")
+    if args.compare:
+        print(compare(results, args.compare))
+    return 1 if any(r.error for r in results) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
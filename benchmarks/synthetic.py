@@ -0,0 +1,470 @@
+"""Seeded generators for whoscored-shaped event data, so benchmarks run without a database.
+
+The frames carry the columns the dashboards read after the joins in
+:class:`fb_viz.helpers.match_bundle.MatchBundle`, with plausible distributions
+rather than real football: events are uniformly spread over each match, passes
+mostly go forwards, and roughly the right share of events are shots, crosses,
+corners, throw ins and so on.
+"""
+import json
+import re
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+from footmav.data_definitions.whoscored.constants import EventType
+
+COMPETITIONS = {
+    "Premier League": "EPL",
+    "La Liga": "La Liga",
+    "Bundesliga": "Bundesliga",
+    "Serie A": "Serie A",
+    "Ligue 1": "Ligue 1",
+}
+TEAMS_PER_LEAGUE = 20
+PLAYERS_PER_TEAM = 14  # 11 starters and 3 substitutes
+FIRST_NAMES = (
+    "james luca mateo noah leon hugo marco pedro ben ali kai joao tom yann erik sami"
+).split()
+LAST_NAMES = (
+    "silva muller rossi martin garcia smith jones dubois schmidt ferrari lopez "
+    "bernard walker costa fischer moreau romano taylor perez wagner"
+).split()
+
+FORMATIONS = {
+    "433": ["GK", "RB", "RCB", "LCB", "LB", "RCM", "DMC", "LCM", "RW", "FW", "LW"],
+    "4231": ["GK", "RB", "RCB", "LCB", "LB", "RCDM", "LCDM", "RW", "CAM", "LW", "FW"],
+    "442": ["GK", "RB", "RCB", "LCB", "LB", "RM", "RCM", "LCM", "LM", "RFW", "LFW"],
+}
+
+# event type name, share of events, probability of a successful outcome
+EVENT_MIX = [
+    ("Pass", 0.55, 0.8),
+    ("BallRecovery", 0.06, 1.0),
+    ("BallTouch", 0.04, 0.6),
+    ("Aerial", 0.04, 0.5),
+    ("Clearance", 0.035, 1.0),
+    ("TakeOn", 0.025, 0.5),
+    ("Tackle", 0.025, 0.65),
+    ("Interception", 0.02, 1.0),
+    ("Foul", 0.02, 0.5),
+    ("BlockedPass", 0.015, 1.0),
+    ("Challenge", 0.01, 0.0),
+    ("MissedShots", 0.008, 1.0),
+    ("SavedShot", 0.006, 1.0),
+    ("Save", 0.005, 1.0),
+    ("OffsidePass", 0.003, 1.0),
+    ("GoodSkill", 0.003, 1.0),
+    ("Goal", 0.002, 1.0),
+    ("ShotOnPost", 0.001, 1.0),
+]
+SHOT_EVENTS = ["MissedShots", "SavedShot", "Goal", "ShotOnPost"]
+
+# whoscored qualifier codes; pass qualifiers are drawn with these probabilities
+PASS_QUALIFIERS = [(2, 0.05), (5, 0.02), (6, 0.01), (107, 0.06), (123, 0.005)]
+PROGRESSIVE_BIT = 1 << 1
+CUTBACK_BIT = 1
+
+
+def _qualifiers_json(codes: List[int]) -> str:
+    return json.dumps(
+        [{"type": {"value": int(code), "displayName": str(code)}} for code in codes]
+    )
+
+
+def _player_names(rng: np.random.Generator, n: int) -> np.ndarray:
+    first = rng.choice(FIRST_NAMES, n)
+    last = rng.choice(LAST_NAMES, n)
+    return np.array([f"{f} {l} {i}" for i, (f, l) in enumerate(zip(first, last))])
+
+
+def generate_fixtures(n_matches: int, seed: int = 0) -> pd.DataFrame:
+    """One row per match: matchId, competition, home and away teams, date and formations"""
+    rng = np.random.default_rng(seed)
+    leagues = list(COMPETITIONS)
+    league_i = rng.integers(0, len(leagues), n_matches)
+    competition = np.array(leagues)[league_i]
+    home_i = rng.integers(0, TEAMS_PER_LEAGUE, n_matches)
+    away_i = (home_i + rng.integers(1, TEAMS_PER_LEAGUE, n_matches)) % TEAMS_PER_LEAGUE
+    formations = list(FORMATIONS)
+    return pd.DataFrame(
+        {
+            "matchId": np.arange(1_600_000, 1_600_000 + n_matches),
+            "competition": competition,
+            "home": [f"{c[:3]} Team {i}" for c, i in zip(competition, home_i)],
+            "away": [f"{c[:3]} Team {i}" for c, i in zip(competition, away_i)],
+            # index of each team in the global player name table
+            "home_id": league_i * TEAMS_PER_LEAGUE + home_i,
+            "away_id": league_i * TEAMS_PER_LEAGUE + away_i,
+            "match_date": pd.Timestamp("2022-08-05")
+            + pd.to_timedelta(np.sort(rng.integers(0, 280, n_matches)), unit="D"),
+            "home_formation": rng.choice(formations, n_matches),
+            "away_formation": rng.choice(formations, n_matches),
+        }
+    )
+
+
+def generate_events(
+    n_matches: int = 1, seed: int = 0, events_per_team: int = 850
+) -> pd.DataFrame:
+    """Events for `n_matches` matches, shaped like `MatchBundle.EVENT_QUERY` results"""
+    rng = np.random.default_rng(seed)
+    fixtures = generate_fixtures(n_matches, seed)
+    names = _player_names(rng, len(COMPETITIONS) * TEAMS_PER_LEAGUE * PLAYERS_PER_TEAM)
+
+    n_sides = n_matches * 2
+    n = n_sides * events_per_team
+    side = np.repeat(np.arange(n_sides), events_per_team)
+    match_i = side // 2
+    is_home = side % 2 == 0
+    fx = fixtures.iloc[match_i]
+    team = np.where(is_home, fx["home"].values, fx["away"].values)
+    opponent = np.where(is_home, fx["away"].values, fx["home"].values)
+    formation = np.where(
+        is_home, fx["home_formation"].values, fx["away_formation"].values
+    )
+    team_ids = np.where(is_home, fx["home_id"].values, fx["away_id"].values)
+    formation_names = list(FORMATIONS)
+    formation_i = pd.Categorical(formation, categories=formation_names).codes
+    position_table = np.array([FORMATIONS[f] for f in formation_names], dtype=object)
+
+    type_names = [e[0] for e in EVENT_MIX]
+    weights = np.array([e[1] for e in EVENT_MIX])
+    type_i = rng.choice(len(EVENT_MIX), n, p=weights / weights.sum())
+    success = np.array([e[2] for e in EVENT_MIX])[type_i]
+    outcome = (rng.random(n) < success).astype(int)
+    type_name = np.array(type_names, dtype=object)[type_i]
+    event_types = {name: EventType[name] for name in type_names}
+    event_type = np.array([event_types[t] for t in type_names], dtype=object)[type_i]
+
+    # starters touch the ball far more than the three substitutes
+    player_weights = np.r_[np.full(11, 1.0), np.full(3, 0.25)]
+    slot = rng.choice(PLAYERS_PER_TEAM, n, p=player_weights / player_weights.sum())
+    player_name = names[team_ids * PLAYERS_PER_TEAM + slot]
+    starter_slot = np.where(slot < 11, slot, slot - 11 + 8)  # subs replace 8, 9, 10
+    position = position_table[formation_i, starter_slot]
+
+    match_seconds = rng.integers(0, 95 * 60, n)
+    x = np.clip(rng.beta(2, 2, n) * 100, 0, 100).round(1)
+    y = np.clip(rng.beta(2, 2, n) * 100, 0, 100).round(1)
+    is_pass = type_name == "Pass"
+    end_x = np.where(is_pass, np.clip(x + rng.normal(8, 18, n), 0, 100), np.nan)
+    end_y = np.where(is_pass, np.clip(y + rng.normal(0, 20, n), 0, 100), np.nan)
+
+    # pre-built qualifier strings, shared between rows
+    templates = [_qualifiers_json([])] + [
+        _qualifiers_json([code]) for code, _ in PASS_QUALIFIERS
+    ]
+    probs = np.array(
+        [1 - sum(p for _, p in PASS_QUALIFIERS)] + [p for _, p in PASS_QUALIFIERS]
+    )
+    qualifier_i = np.where(is_pass, rng.choice(len(templates), n, p=probs), 0)
+    qualifiers = np.array(templates, dtype=object)[qualifier_i]
+
+    passtypes = np.where(
+        is_pass,
+        (rng.random(n) < 0.12) * PROGRESSIVE_BIT + (rng.random(n) < 0.01) * CUTBACK_BIT,
+        np.nan,
+    )
+    receiver_slot = (slot + rng.integers(1, 11, n)) % 11
+    has_receiver = is_pass & (outcome == 1)
+    pass_receiver = np.where(
+        has_receiver, names[team_ids * PLAYERS_PER_TEAM + receiver_slot], None
+    )
+    pass_receiver_position = np.where(
+        has_receiver, position_table[formation_i, receiver_slot], None
+    )
+    is_shot = np.isin(type_name, SHOT_EVENTS)
+    xg = np.where(is_shot, rng.beta(1.2, 10, n).round(3), np.nan)
+
+    data = pd.DataFrame(
+        {
+            "matchId": fx["matchId"].values,
+            "match_seconds": match_seconds,
+            "team": team,
+            "opponent": opponent,
+            "is_home_team": is_home,
+            "competition": fx["competition"].values,
+            "season": 2023,
+            "match_date": fx["match_date"].values,
+            "player_name": player_name,
+            "shirt_number": slot + 1,
+            "formation": formation,
+            "position": position,
+            "event_type": event_type,
+            "outcomeType": outcome,
+            "x": x,
+            "y": y,
+            "endX": end_x.round(1),
+            "endY": end_y.round(1),
+            "qualifiers": qualifiers,
+            "passtypes": passtypes,
+            "pass_receiver": pass_receiver,
+            "pass_receiver_position": pass_receiver_position,
+            "pass_receiver_shirt_number": np.where(
+                has_receiver, receiver_slot + 1, np.nan
+            ),
+            "xG": xg,
+            "xT": np.where(is_pass, rng.normal(0.002, 0.01, n).round(4), np.nan),
+            "decorated_name": team,
+            "league_decorated_name": fx["competition"].map(COMPETITIONS).values,
+            "has_extra_event_info": True,
+        }
+    )
+    data = pd.concat([data, _substitutions(fixtures, names)])
+    data = data.sort_values(["matchId", "match_seconds"], kind="mergesort")
+    data = data.reset_index(drop=True)
+    data["period"] = np.where(data["match_seconds"] < 45 * 60, 1, 2)
+    data["minute"] = data["match_seconds"] // 60
+    data["second"] = data["match_seconds"] % 60
+    data["eventId"] = data.groupby("matchId").cumcount() + 1
+    data["id"] = np.arange(len(data)) + 1
+    data["possession_number"] = (
+        (data["team"] != data["team"].shift()) | (data["matchId"].diff() != 0)
+    ).cumsum()
+
+    goals = data["event_type"] == EventType.Goal
+    scores = (
+        data.loc[goals]
+        .groupby(["matchId", "is_home_team"])
+        .size()
+        .unstack(fill_value=0)
+    )
+    scores = scores.reindex(
+        index=fixtures["matchId"], columns=[True, False], fill_value=0
+    )
+    data["home_score"] = data["matchId"].map(scores[True])
+    data["away_score"] = data["matchId"].map(scores[False])
+    data["team_score"] = np.where(
+        data["is_home_team"], data["home_score"], data["away_score"]
+    )
+    data["opponent_score"] = np.where(
+        data["is_home_team"], data["away_score"], data["home_score"]
+    )
+    data["game_state"] = np.sign(data["team_score"] - data["opponent_score"])
+    return data
+
+
+def _substitutions(fixtures: pd.DataFrame, names: np.ndarray) -> pd.DataFrame:
+    """SubstitutionOff/On pairs around the hour mark, three per team"""
+    rows = []
+    for fixture in fixtures.itertuples():
+        for is_home, team, opponent, team_id, formation in [
+            (True, fixture.home, fixture.away, fixture.home_id, fixture.home_formation),
+            (
+                False,
+                fixture.away,
+                fixture.home,
+                fixture.away_id,
+                fixture.away_formation,
+            ),
+        ]:
+            base = team_id * PLAYERS_PER_TEAM
+            for i, starter in enumerate([8, 9, 10]):
+                second = 60 * 60 + i * 600
+                for event_type, slot, position in [
+                    (
+                        EventType.SubstitutionOff,
+                        starter,
+                        FORMATIONS[formation][starter],
+                    ),
+                    (EventType.SubstitutionOn, 11 + i, "Substitute"),
+                ]:
+                    rows.append(
+                        dict(
+                            matchId=fixture.matchId,
+                            match_seconds=second,
+                            team=team,
+                            opponent=opponent,
+                            is_home_team=is_home,
+                            competition=fixture.competition,
+                            season=2023,
+                            match_date=fixture.match_date,
+                            player_name=names[base + slot],
+                            shirt_number=slot + 1,
+                            formation=formation,
+                            position=position,
+                            event_type=event_type,
+                            outcomeType=1,
+                            x=0.0,
+                            y=0.0,
+                            qualifiers="[]",
+                            decorated_name=team,
+                            league_decorated_name=COMPETITIONS[fixture.competition],
+                            has_extra_event_info=True,
+                        )
+                    )
+    return pd.DataFrame(rows)
+
+
+def generate_carries(events: pd.DataFrame, seed: int = 0) -> pd.DataFrame:
+    """Implied carries between consecutive events of the same team"""
+    rng = np.random.default_rng(seed)
+    nxt = events.shift(-1)
+    mask = (
+        (events["team"] == nxt["team"])
+        & (events["matchId"] == nxt["matchId"])
+        & (events["event_type"] == EventType.Pass)
+        & (events["outcomeType"] == 1)
+        & (rng.random(len(events)) < 0.6)
+    )
+    carry_columns = (
+        "eventId minute second period matchId season competition match_seconds "
+        "team opponent is_home_team"
+    ).split()
+    carries = events.loc[mask, carry_columns].copy()
+    carries["player_name"] = events.loc[mask, "pass_receiver"].values
+    carries["x"] = events.loc[mask, "endX"].values
+    carries["y"] = events.loc[mask, "endY"].values
+    carries["endX"] = nxt.loc[mask, "x"].values
+    carries["endY"] = nxt.loc[mask, "y"].values
+    carries["qualifiers"] = "[]"
+    carries["event_type"] = EventType.Carry
+    carries["outcomeType"] = 1
+    carries["sub_id"] = 2
+    carries["carryId"] = np.arange(len(carries)) + 1
+    return carries.reset_index(drop=True)
+
+
+def positions_frame() -> pd.DataFrame:
+    """Stand-in for football_data.whoscored_positions"""
+    return pd.DataFrame(
+        [
+            dict(formation_name="-".join(name), position=position, sort_id=i)
+            for name, positions in FORMATIONS.items()
+            for i, position in enumerate(positions)
+        ]
+    )
+
+
+def generate_power_rank_data(n_matches: int, seed: int = 0) -> pd.DataFrame:
+    """Rows shaped like `PowerRank.get_data_last_n_games`, one per player per match"""
+    rng = np.random.default_rng(seed)
+    fixtures = generate_fixtures(n_matches, seed)
+    names = _player_names(rng, len(COMPETITIONS) * TEAMS_PER_LEAGUE * PLAYERS_PER_TEAM)
+    frames = []
+    for is_home in [True, False]:
+        squad = fixtures["home" if is_home else "away"]
+        opponent = fixtures["away" if is_home else "home"]
+        for slot in range(PLAYERS_PER_TEAM):
+            frames.append(
+                pd.DataFrame(
+                    {
+                        "match_id": fixtures["matchId"],
+                        "date": fixtures["match_date"],
+                        "season": 2023,
+                        "comp": fixtures["competition"],
+                        "domestic league": fixtures["competition"],
+                        "squad": squad,
+                        "team_name": squad,
+                        "decorated_name": squad,
+                        "opponent": opponent,
+                        "team_id": fixtures["home_id" if is_home else "away_id"],
+                        "slot": slot,
+                        "rank_position": "GK" if slot == 0 else "MF",
+                    }
+                )
+            )
+    data = pd.concat(frames, ignore_index=True)
+    data["player"] = names[data["team_id"] * PLAYERS_PER_TEAM + data["slot"]]
+    n = len(data)
+    for column, scale in [
+        ("defending", 150),
+        ("finishing", 80),
+        ("progressing", 300),
+        ("providing", 100),
+    ]:
+        data[column] = rng.gamma(2.0, scale / 2, n).round(1)
+    data["keeping"] = np.where(
+        data["rank_position"] == "GK", rng.normal(100, 200, n).round(1), 0.0
+    )
+    data["total"] = data[
+        ["defending", "finishing", "progressing", "providing", "keeping"]
+    ].sum(axis=1)
+    return (
+        data.drop(columns=["team_id", "slot"])
+        .sort_values("date")
+        .reset_index(drop=True)
+    )
+
+
+def generate_team_of_the_week(seed: int = 0, league: str = "Premier League"):
+    """Rows shaped like `TeamOfTheWeek.get_data`, plus its ranking baseline"""
+    rng = np.random.default_rng(seed)
+    placements = ["GK", "RB", "RCB", "LCB", "LB", "RCM", "CM", "LCM", "RW", "ST", "LW"]
+    categories = ["passes_into_penalty_area", "sca", "tackles_won", "clean_sheets"]
+    stats = (
+        "shotstopping distribution area_control defending finishing providing "
+        "progressing"
+    ).split()
+    rows = []
+    for i, placement in enumerate(placements):
+        row = dict(
+            squad=f"{league[:3]} Team {rng.integers(0, TEAMS_PER_LEAGUE)}",
+            image_name_override=None,
+            comp=league,
+            decorated_name=COMPETITIONS[league],
+            label="7",
+            placement_position=placement,
+            position="GK" if placement == "GK" else "MF",
+            player=f"{FIRST_NAMES[i]} {LAST_NAMES[i]}",
+            total=float(rng.integers(100, 1000)),
+        )
+        for j in range(1, 4):
+            row[f"top_category_{j}"] = categories[j]
+            row[f"top_value_{j}"] = float(rng.integers(1, 6))
+        for stat in stats:
+            row[stat] = float(rng.gamma(2, 50))
+        rows.append(row)
+    baseline = pd.DataFrame(
+        {stat: rng.gamma(2, 50, 2000) for stat in stats}
+        | {"position": rng.choice(["GK", "MF"], 2000, p=[0.1, 0.9])}
+    )
+    return pd.DataFrame(rows), baseline
+
+
+def generate_player_season_stats(n_players: int = 500, seed: int = 0) -> pd.DataFrame:
+    """fbref style per-player season totals for the scatter plot"""
+    from footmav import fb
+
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            fb.PLAYER.N: _player_names(rng, n_players),
+            fb.COMPETITION.N: rng.choice(list(COMPETITIONS), n_players),
+            "npxg_per90": rng.gamma(2, 0.12, n_players),
+            "xa_per90": rng.gamma(2, 0.08, n_players),
+        }
+    )
+
+
+class SyntheticConnection:
+    """Answers the queries fb_viz issues from in-memory synthetic frames"""
+
+    def __init__(
+        self,
+        events: pd.DataFrame,
+        carries: pd.DataFrame = None,
+        positions: pd.DataFrame = None,
+        tables: Dict[str, pd.DataFrame] = None,
+    ):
+        self.events = events
+        self.carries = carries if carries is not None else generate_carries(events)
+        self.positions = positions if positions is not None else positions_frame()
+        # extra frames returned for any query mentioning the table name
+        self.tables = tables or {}
+
+    def query(self, sql: str) -> pd.DataFrame:
+        if "whoscored_positions" in sql:
+            return self.positions.copy()
+        for table, frame in self.tables.items():
+            if table in sql:
+                return frame.copy()
+        match_id = re.search(r"matchId\s*=\s*(\d+)", sql)
+        source = self.carries if "implied_carries" in sql else self.events
+        if match_id is None:
+            return source.copy()
+        return source.loc[source["matchId"] == int(match_id.group(1))].copy()
+
+    def wsquery(self, sql: str) -> pd.DataFrame:
+        return self.query(sql)
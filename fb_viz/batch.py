@@ -0,0 +1,295 @@
+"""Render a batch of dashboards (e.g. a full matchday) across a process pool.
+
+Usage::
+
+    python -m fb_viz.batch jobs.json --output-dir renders --workers 8
+
+where ``jobs.json`` is a list of objects with the fields of :class:`RenderJob`,
+for example ``{"dashboard": "PassingDashboard", "match_id": 1640674, "team": "Arsenal"}``.
+"""
+import argparse
+import importlib
+import json
+import os
+import time
+import traceback
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional
+
+DASHBOARD_MODULES = {
+    "PassingDashboard": "fb_viz.dashboards.passing_dashboard",
+    "DefensiveDashboard": "fb_viz.dashboards.defensive_dashboard",
+    "PassNetworkDashboard": "fb_viz.dashboards.passnetwork_dashboard",
+    "MatchSummaryDashboard": "fb_viz.dashboards.match_summary",
+    "HBRProgressiveDistance": "fb_viz.dashboards.hbr_dashboards",
+    "HBRExpectedGoalContributions": "fb_viz.dashboards.hbr_dashboards",
+    "HBRChanceCreation": "fb_viz.dashboards.hbr_dashboards",
+    "HBRDuels": "fb_viz.dashboards.hbr_dashboards",
+    "GroundDuelsPitchArea": "fb_viz.dashboards.pitch_area_dashboard",
+    "TouchesPitchArea": "fb_viz.dashboards.pitch_area_dashboard",
+}
+
+
+@dataclass
+class RenderJob:
+    dashboard: str
+    match_id: Optional[int] = None
+    team: Optional[str] = None
+    date: Optional[str] = None
+    # constructor arguments, on top of the connection (and image grabber)
+    init_kwargs: Dict = field(default_factory=dict)
+    # arguments to `plot`, or `draw` for the match dashboards
+    plot_kwargs: Dict = field(default_factory=dict)
+    filename: Optional[str] = None
+
+    def output_name(self) -> str:
+        if self.filename:
+            return self.filename
+        match = self.match_id if self.match_id is not None else self.date
+        team = (self.team or "match").replace(" ", "_").lower()
+        return f"{match}_{team}_{self.dashboard.split('.')[-1]}.png"
+
+
+@dataclass
+class JobResult:
+    job: RenderJob
+    path: Optional[str]
+    load_seconds: float
+    render_seconds: float
+    save_seconds: float
+    error: Optional[str] = None
+
+    @property
+    def seconds(self) -> float:
+        return self.load_seconds + self.render_seconds + self.save_seconds
+
+
+def default_connection():
+    from dbconnect.connector import Connection
+
+    return Connection("M0neyMa$e")
+
+
+def resolve_dashboard(name: str):
+    if "." in name:
+        module_name, class_name = name.rsplit(".", 1)
+    else:
+        module_name, class_name = DASHBOARD_MODULES[name], name
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def render_figure(cls, job: RenderJob, connection, bundle):
+    from fb_viz.dashboards.dashboard import Dashboard
+    from fb_viz.helpers.mclachbot_helpers import sportsdb_image_grabber
+
+    if issubclass(cls, Dashboard):
+        dashboard = cls(connection, sportsdb_image_grabber, **job.init_kwargs)
+        fig, _ = dashboard.plot(
+            dashboard.get_data(job.team, job.date, bundle=bundle), **job.plot_kwargs
+        )
+        return fig
+    dashboard = cls(connection, **job.init_kwargs)
+    result = dashboard.draw(
+        dashboard.get_data(job.match_id, bundle=bundle), **job.plot_kwargs
+    )
+    return result[0] if isinstance(result, tuple) else result
+
+
+_worker_connection = None
+
+
+def _init_worker(connection_factory: Callable):
+    global _worker_connection
+    import matplotlib
+
+    matplotlib.use("Agg")
+    _worker_connection = connection_factory()
+
+
+def _render_match(
+    jobs: List[RenderJob], output_dir: str, dpi: int, profile_dir: str = None
+) -> List[JobResult]:
+    """Render every job for one match, sharing a single MatchBundle between them"""
+    if profile_dir is None:
+        return _render_match_jobs(jobs, output_dir, dpi)
+    from fb_viz.helpers.instrumentation import RenderProfiler
+
+    with RenderProfiler() as profiler:
+        results = _render_match_jobs(jobs, output_dir, dpi)
+    name = os.path.splitext(jobs[0].output_name())[0]
+    profiler.write_chrome_trace(os.path.join(profile_dir, f"{name}.trace.json"))
+    with open(os.path.join(profile_dir, f"{name}.summary.txt"), "w") as fp:
+        fp.write(profiler.summary_table())
+    return results
+
+
+def _render_match_jobs(
+    jobs: List[RenderJob], output_dir: str, dpi: int
+) -> List[JobResult]:
+    from fb_viz.helpers.instrumentation import stage
+    from fb_viz.helpers.match_bundle import MatchBundle
+
+    results = []
+    start = time.perf_counter()
+    try:
+        first = jobs[0]
+        if first.match_id is not None:
+            bundle = MatchBundle.load(_worker_connection, first.match_id)
+        else:
+            bundle = MatchBundle.load_for_team(
+                _worker_connection, first.team, first.date
+            )
+    except Exception:
+        error = traceback.format_exc()
+        elapsed = time.perf_counter() - start
+        return [JobResult(job, None, elapsed, 0, 0, error) for job in jobs]
+    load_seconds = time.perf_counter() - start
+    for job in jobs:
+        path = os.path.join(output_dir, job.output_name())
+        render_seconds = save_seconds = 0.0
+        try:
+            start = time.perf_counter()
+            with stage(f"render {job.dashboard}"):
+                fig = render_figure(
+                    resolve_dashboard(job.dashboard), job, _worker_connection, bundle
+                )
+            render_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            with stage("savefig"):
+                fig.savefig(path, dpi=dpi, facecolor=fig.get_facecolor())
+            save_seconds = time.perf_counter() - start
+            results.append(
+                JobResult(job, path, load_seconds, render_seconds, save_seconds)
+            )
+        except Exception:
+            results.append(
+                JobResult(
+                    job,
+                    None,
+                    load_seconds,
+                    render_seconds,
+                    save_seconds,
+                    traceback.format_exc(),
+                )
+            )
+        # the bundle load is only paid once per match
+        load_seconds = 0.0
+    return results
+
+
+def render_jobs(
+    jobs: List[RenderJob],
+    output_dir: str,
+    connection_factory: Callable = default_connection,
+    max_workers: int = None,
+    dpi: int = 100,
+    profile_dir: str = None,
+) -> List[JobResult]:
+    """Render `jobs` in parallel, one task per match so each match is queried once.
+
+    `connection_factory` is called once in every worker process and must be
+    picklable (i.e. a module level function).  With `profile_dir`, a Chrome trace
+    and a stage summary are written there for every match.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    if profile_dir is not None:
+        os.makedirs(profile_dir, exist_ok=True)
+    by_match = defaultdict(list)
+    for job in jobs:
+        key = job.match_id if job.match_id is not None else (job.team, job.date)
+        by_match[key].append(job)
+
+    results = []
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_worker,
+        initargs=(connection_factory,),
+    ) as executor:
+        futures = [
+            executor.submit(_render_match, match_jobs, output_dir, dpi, profile_dir)
+            for match_jobs in by_match.values()
+        ]
+        for future in as_completed(futures):
+            results.extend(future.result())
+    return results
+
+
+def summarise(results: List[JobResult]) -> str:
+    from tabulate import tabulate
+
+    rows = [
+        [
+            r.job.dashboard,
+            r.job.match_id if r.job.match_id is not None else r.job.date,
+            r.job.team or "",
+            f"{r.load_seconds:.2f}",
+            f"{r.render_seconds:.2f}",
+            f"{r.save_seconds:.2f}",
+            f"{r.seconds:.2f}",
+            "ok" if r.error is None else "FAILED",
+        ]
+        for r in sorted(results, key=lambda r: -r.seconds)
+    ]
+    return tabulate(
+        rows,
+        headers=["Dashboard", "Match", "Team", "Load", "Render", "Save", "Total", ""],
+        tablefmt="simple",
+    )
+
+
+def _load_factory(spec: str) -> Callable:
+    module_name, attr = spec.split(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render a batch of fb_viz dashboards")
+    parser.add_argument("jobs", help="JSON file with a list of render jobs")
+    parser.add_argument("--output-dir", default="renders")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--dpi", type=int, default=100)
+    parser.add_argument(
+        "--connection",
+        default="fb_viz.batch:default_connection",
+        help="module:callable returning a database connection",
+    )
+    parser.add_argument(
+        "--timings", default=None, help="optional path to write per-job timings as JSON"
+    )
+    parser.add_argument(
+        "--profile",
+        default=None,
+        help="directory to write per-stage Chrome traces and summaries to",
+    )
+    args = parser.parse_args(argv)
+
+    with open(args.jobs) as fp:
+        jobs = [RenderJob(**job) for job in json.load(fp)]
+
+    start = time.perf_counter()
+    results = render_jobs(
+        jobs,
+        args.output_dir,
+        connection_factory=_load_factory(args.connection),
+        max_workers=args.workers,
+        dpi=args.dpi,
+        profile_dir=args.profile,
+    )
+    wall = time.perf_counter() - start
+    print(summarise(results))
+    failed = [r for r in results if r.error is not None]
+    for r in failed:
+        print(f"\n{r.job}\n{r.error}")
+    print(f"\n{len(results) - len(failed)}/{len(results)} rendered in {wall:.1f}s")
+    if args.timings:
+        with open(args.timings, "w") as fp:
+            json.dump(
+                [dict(asdict(r), seconds=r.seconds) for r in results], fp, indent=2
+            )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -6,6 +6,9 @@ from fb_viz.helpers.mclachbot_helpers import get_mclachhead
 from mplsoccer import add_image
 from fb_viz.helpers.mplsoccer_helpers import make_grid
 from mplsoccer.pitch import Pitch
+from fb_viz.helpers.match_bundle import MatchBundle
+from fb_viz.helpers.qualifiers import attach_qualifier_flags
+from fb_viz.helpers.instrumentation import instrumented, stage
 import json
 
 
@@ -159,10 +162,16 @@ class Dashboard(ABC):
             self.opponent_display_name = metadata_df["home_decorated_name"].iloc[0]
         return match_id
 
+    def set_match_day_data_from_bundle(self, bundle: MatchBundle, team: str) -> int:
+        for k, v in bundle.team_display_info(team).items():
+            setattr(self, k, v)
+        return bundle.match_id
+
     @abstractmethod
-    def get_data(self, team: str, date: str):
+    def get_data(self, team: str, date: str, bundle: MatchBundle = None):
         pass
 
+    @instrumented()
     def plot(
         self,
         data,
@@ -181,36 +190,39 @@ class Dashboard(ABC):
             linewidth=linewidth,
         )
 
-        fig, axes = make_grid(
-            pitch,
-            nrows=self.GRID_NROWS,
-            ncols=self.GRID_NCOLS,
-            axis=self.DEBUG,
-            **grid_params,
-        )
+        with stage("make_grid"):
+            fig, axes = make_grid(
+                pitch,
+                nrows=self.GRID_NROWS,
+                ncols=self.GRID_NCOLS,
+                axis=self.DEBUG,
+                **grid_params,
+            )
         if not self.DEBUG:
             fig.set_facecolor(pitch_color)
 
-            add_image(
-                get_mclachhead(),
-                fig,
-                left=self.MCLACHEAD_COORDS[0],
-                bottom=self.MCLACHEAD_COORDS[1],
-                width=self.MCLACHEAD_COORDS[2],
-                height=self.MCLACHEAD_COORDS[3],
+            with stage("header", data, fig):
+                add_image(
+                    get_mclachhead(),
+                    fig,
+                    left=self.MCLACHEAD_COORDS[0],
+                    bottom=self.MCLACHEAD_COORDS[1],
+                    width=self.MCLACHEAD_COORDS[2],
+                    height=self.MCLACHEAD_COORDS[3],
+                )
+                self.standard_header(data, fig, axes["title"], pitch_color)
+                axes["endnote"].text(
+                    transform=axes["endnote"].transAxes,
+                    color=marker_base_color,
+                    fontproperties=font_normal.prop,
+                    fontsize=10,
+                    **self.WATERMARK_DICT,
+                )
+                axes["endnote"].set_facecolor(pitch_color)
+        with stage(f"{type(self).__name__}._dashboard_plot_impl", data, fig):
+            return self._dashboard_plot_impl(
+                fig, axes, pitch, data, pitch_color, line_color, marker_base_color
             )
-            self.standard_header(data, fig, axes["title"], pitch_color)
-            axes["endnote"].text(
-                transform=axes["endnote"].transAxes,
-                color=marker_base_color,
-                fontproperties=font_normal.prop,
-                fontsize=10,
-                **self.WATERMARK_DICT,
-            )
-            axes["endnote"].set_facecolor(pitch_color)
-        return self._dashboard_plot_impl(
-            fig, axes, pitch, data, pitch_color, line_color, marker_base_color
-        )
 
     @abstractmethod
     def _dashboard_plot_impl(
@@ -233,10 +245,13 @@ class WithFormationDataMixin:
         ORDER BY W.period, W.minute, W.second, W.eventId
         """
 
-    def attach_positional_data(self, data):
-        position_df = self.connection.query(
-            "SELECT * FROM football_data.whoscored_positions"
-        )
+    @instrumented()
+    def attach_positional_data(self, data, position_df=None):
+        if position_df is None:
+            position_df = self.connection.query(
+                "SELECT * FROM football_data.whoscored_positions"
+            )
+        position_df = position_df.copy()
         position_df["formation_name"] = position_df["formation_name"].apply(
             lambda x: x.replace("-", "")
         )
@@ -250,12 +265,19 @@ class WithFormationDataMixin:
         )
         return data
 
-    def get_data(self, team: str, date: str):
+    @instrumented()
+    def get_data(self, team: str, date: str = None, bundle: MatchBundle = None):
+        if bundle is not None:
+            self.set_match_day_data_from_bundle(bundle, team)
+            return self.attach_positional_data(
+                bundle.team_events(self.team), bundle.positions
+            )
 
         match_id = self.get_match_day_data(team, date)
 
         query2 = self.DATA_QUERY.format(match_id, self.team)
 
-        data = self.connection.wsquery(query2)
+        with stage("query"):
+            data = attach_qualifier_flags(self.connection.wsquery(query2))
 
         return self.attach_positional_data(data)
@@ -8,6 +8,7 @@ from fb_viz.helpers.pitch_helpers import (
 )
 
 from fb_viz.helpers.fonts import font_normal, font_bold
+from fb_viz.definitions.events import attach_defensive_event_codes
 from footmav.data_definitions.whoscored.constants import EventType
 import math
 import json
@@ -101,28 +102,32 @@ class DefensiveDashboard(WithFormationDataMixin, Dashboard):
             loc="upper left",
         )
         names = self.extract_names_sorted_by_position(data, exclude_positions=["GK"])
+        attach_defensive_event_codes(data)
+        player_data = dict(tuple(data.groupby("player_name", sort=False)))
         for i, name in enumerate(names):
             r_i = int(math.floor(i / 3))
             r_j = i % 3
 
             if name:
+                player_events = player_data.get(name, data.iloc[:0])
                 draw_defensive_events_on_axes(
                     axes["pitch"][(r_i, r_j)],
-                    data.loc[data["player_name"] == name],
+                    player_events,
                     pitch,
                     25,
                     marker_base_color,
                     line_color,
+                    combine_markers=True,
                 )
                 draw_convex_hull_without_outliers_on_axes(
                     axes["pitch"][(r_i, r_j)],
-                    data.loc[data["player_name"] == name],
+                    player_events,
                     pitch,
                     0.1,
                 )
                 self.player_name_and_info(
                     axes["pitch"][(r_i, r_j)],
-                    data.loc[data["player_name"] == name],
+                    player_events,
                     line_color,
                 )
 
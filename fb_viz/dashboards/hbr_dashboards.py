@@ -3,13 +3,20 @@ import pandas as pd
 from matplotlib.figure import Figure
 from matplotlib.axes import Axes
 from fb_viz.helpers.fonts import font_normal, font_mono, font_bold, font_italic
-from fb_viz.helpers.mclachbot_helpers import sportsdb_image_grabber
+from fb_viz.helpers.mclachbot_helpers import (
+    sportsdb_badge_url,
+    INSTA_IMAGE_URL,
+    TWITTER_IMAGE_URL,
+)
 from matplotlib.patches import FancyBboxPatch
 from footmav.data_definitions.whoscored.constants import EventType
 from mplsoccer import add_image
 from abc import ABC, abstractmethod
-from fb_viz.helpers.mclachbot_helpers import get_twitter_image, get_insta_image
+from fb_viz.helpers.asset_prefetch import prefetch_images
+from fb_viz.helpers.instrumentation import instrumented
 from fb_viz.helpers import aggregators
+from fb_viz.helpers.match_bundle import MatchBundle
+from fb_viz.helpers.qualifiers import attach_qualifier_flags
 
 
 class HorizontalBarRanking(ABC):
@@ -60,7 +67,10 @@ class HorizontalBarRanking(ABC):
         else:
             return "red"
 
-    def get_data(self, match_id: int) -> dict:
+    @instrumented()
+    def get_data(self, match_id: int = None, bundle: MatchBundle = None) -> dict:
+        if bundle is not None:
+            return bundle.events_with_carries()
         query = f"""
         SELECT W.*,
         E.shirt_number, E.formation, E.position, E.pass_receiver, E.pass_receiver_shirt_number, E.pass_receiver_position,
@@ -93,9 +103,9 @@ class HorizontalBarRanking(ABC):
         WHERE matchId={match_id}
         """
 
-        data1 = self._connection.wsquery(query)
+        data1 = attach_qualifier_flags(self._connection.wsquery(query))
         data1["sub_id"] = 1
-        data2 = self._connection.wsquery(query2)
+        data2 = attach_qualifier_flags(self._connection.wsquery(query2))
 
         data = pd.concat([data1, data2])
         data["sub_id"] = data["sub_id"].fillna(1)
@@ -107,7 +117,23 @@ class HorizontalBarRanking(ABC):
     def _prep_dataframe(self, data) -> pd.DataFrame:
         pass
 
+    def _asset_urls(self, data) -> dict:
+        league = data["competition"].iloc[0]
+        home_team = data.loc[data["is_home_team"] == True, "team"].iloc[0]
+        away_team = data.loc[data["is_home_team"] == False, "team"].iloc[0]
+        return {
+            "home_badge": sportsdb_badge_url(home_team, league),
+            "away_badge": sportsdb_badge_url(away_team, league),
+            "insta": INSTA_IMAGE_URL,
+            "twitter": TWITTER_IMAGE_URL,
+        }
+
+    def _fetch_assets(self, data) -> dict:
+        return prefetch_images(self._asset_urls(data))
+
+    @instrumented()
     def draw(self, data):
+        assets = self._fetch_assets(data)
         prepped_df = self._prep_dataframe(data)
         fig = Figure(
             figsize=(7, 10),
@@ -121,14 +147,16 @@ class HorizontalBarRanking(ABC):
             gridspec_kw=dict(height_ratios=[0.1, 0.8, 0.1]),
         )
         self.draw_main(axes["main"], prepped_df)
-        self._draw_top(data, fig, axes["header"])
+        self._draw_top(data, fig, axes["header"], assets)
         self._draw_bottom(data, fig, axes["footer"])
-        add_image(
-            get_insta_image(), fig, left=0.915, bottom=0.01, width=0.03, height=0.03
-        )
-        add_image(
-            get_twitter_image(), fig, left=0.95, bottom=0.01, width=0.03, height=0.03
-        )
+        if assets["insta"] is not None:
+            add_image(
+                assets["insta"], fig, left=0.915, bottom=0.01, width=0.03, height=0.03
+            )
+        if assets["twitter"] is not None:
+            add_image(
+                assets["twitter"], fig, left=0.95, bottom=0.01, width=0.03, height=0.03
+            )
 
         return fig
 
@@ -185,7 +213,8 @@ class HorizontalBarRanking(ABC):
     def _format_total(self, n: float):
         return f"{n:.0f}"
 
-    def _draw_top(self, data, fig, ax):
+    def _draw_top(self, data, fig, ax, assets: dict = None):
+        assets = assets or self._fetch_assets(data)
         ax.set_facecolor(self._facecolor)
         ax.set_axis_off()
         date = data["match_date"].iloc[0]
@@ -199,7 +228,6 @@ class HorizontalBarRanking(ABC):
             (data["is_home_team"] == False) & (data["event_type"] != EventType.Carry),
             "decorated_name",
         ].iloc[0]
-        league = data["competition"].iloc[0]
         ax.add_patch(
             FancyBboxPatch(
                 (-0.05, 0),
@@ -276,12 +304,8 @@ class HorizontalBarRanking(ABC):
             fontproperties=font_normal.prop,
             fontsize=14,
         )
-        home_img = sportsdb_image_grabber(
-            data.loc[data["is_home_team"] == True, "team"].iloc[0], league
-        )
-        away_img = sportsdb_image_grabber(
-            data.loc[data["is_home_team"] == False, "team"].iloc[0], league
-        )
+        home_img = assets["home_badge"]
+        away_img = assets["away_badge"]
         ax.text(
             0.5,
             -0.3,
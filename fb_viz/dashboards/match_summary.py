@@ -1,4 +1,7 @@
-from typing import Tuple
+from abc import ABC, abstractmethod
+from typing import List, Tuple
+import numpy as np
+import pandas as pd
 from footmav.event_aggregation import aggregators as agg
 from footmav.event_aggregation.event_aggregator_processor import event_aggregator
 from matplotlib.figure import Figure
@@ -6,6 +9,10 @@ from matplotlib.axes import Axes
 from matplotlib.patches import FancyBboxPatch
 from fb_viz.helpers.fonts import font_bold, font_normal, font_italic, font_mono
 from fb_viz.helpers.mclachbot_helpers import sportsdb_image_grabber
+from fb_viz.helpers.match_bundle import MatchBundle
+from fb_viz.helpers.possession import possession_durations
+from fb_viz.helpers.qualifiers import attach_qualifier_flags
+from fb_viz.helpers.instrumentation import instrumented
 
 
 @event_aggregator
@@ -14,67 +21,127 @@ def npxgot(dataframe):
 
 
 def agg_minutes(dataframe):
-    seconds_dict = {}
     home = dataframe.loc[dataframe["is_home_team"] == True, "team"].iloc[0]
     away = dataframe.loc[dataframe["is_home_team"] == False, "team"].iloc[0]
+    pct = possession_durations(dataframe, by=None).set_index("team")["pct"]
+    return (pct[home], pct[away])
 
-    for i, g in dataframe.groupby("possession_number"):
-        team = g["team"].iloc[0]
-        seconds = g["match_seconds"].max() - g["match_seconds"].min()
-        if team in seconds_dict:
-            seconds_dict[team] += seconds
-        else:
-            seconds_dict[team] = seconds
-    return (
-        seconds_dict[home] / sum(seconds_dict.values()) * 100,
-        seconds_dict[away] / sum(seconds_dict.values()) * 100,
-    )
 
+class StatExpr(ABC):
+    """A per-team match stat that the StatEngine can evaluate from grouped totals"""
+
+    def totals(self) -> List["Total"]:
+        return []
+
+    @abstractmethod
+    def column(self, engine: "StatEngine") -> pd.Series:
+        """Value for every (matchId, team) the engine was built on"""
+        pass
+
+    def __call__(self, dataframe) -> Tuple[float, float]:
+        return StatEngine(dataframe, [self]).value(self)
+
+
+class Total(StatExpr):
+    """Sum of an event aggregator, or of its successful events, for each team"""
+
+    def __init__(self, aggregator, success: bool = False):
+        self.aggregator = aggregator
+        self.success = success
+
+    @property
+    def key(self) -> str:
+        return f"{self.aggregator.col_name}{'_success' if self.success else ''}"
+
+    def values(self, dataframe):
+        if self.success:
+            return self.aggregator.success(dataframe)
+        return self.aggregator(dataframe)
+
+    def totals(self) -> List["Total"]:
+        return [self]
 
-def stat_wrapper(f):
-    def wrapper(dataframe, *args, **kwargs):
-        data = dataframe.copy()
-        data[f.col_name] = f(data, *args, **kwargs)
-        group = data.groupby("team").agg({f.col_name: "sum"}).to_dict()[f.col_name]
-        home = data.loc[data["is_home_team"] == True, "team"].iloc[0]
-        away = data.loc[data["is_home_team"] == False, "team"].iloc[0]
-        return (group[home], group[away])
+    def column(self, engine: "StatEngine") -> pd.Series:
+        return engine.totals[self.key]
 
-    return wrapper
 
+class SuccessPct(StatExpr):
+    def __init__(self, successful: Total, attempted: Total):
+        self.successful = successful
+        self.attempted = attempted
 
-def stat_wrapper_success(f):
-    def wrapper(dataframe, *args, **kwargs):
-        data = dataframe.copy()
-        data[f.col_name] = f.success(data, *args, **kwargs)
-        group = data.groupby("team").agg({f.col_name: "sum"}).to_dict()[f.col_name]
-        home = data.loc[data["is_home_team"] == True, "team"].iloc[0]
-        away = data.loc[data["is_home_team"] == False, "team"].iloc[0]
-        return (group[home], group[away])
+    def totals(self) -> List[Total]:
+        return [self.successful, self.attempted]
 
-    return wrapper
+    def column(self, engine: "StatEngine") -> pd.Series:
+        return self.successful.column(engine) / self.attempted.column(engine) * 100
 
 
-def stat_wrapper_success_pct(f):
-    def wrapper(dataframe, *args, **kwargs):
-        data = dataframe.copy()
-        data[f"{f.col_name}_success"] = f.success(data, *args, **kwargs)
-        data[f.col_name] = f(data, *args, **kwargs)
-        group = data.groupby("team").agg(
-            {f.col_name: "sum", f"{f.col_name}_success": "sum"}
+class PossessionPct(StatExpr):
+    def column(self, engine: "StatEngine") -> pd.Series:
+        by = "matchId" if "matchId" in engine.keys else None
+        durations = possession_durations(engine.data, by=by)
+        return durations.set_index(engine.keys)["pct"].reindex(engine.totals.index)
+
+
+class StatEngine:
+    """Evaluates a list of stats for every team of every match in `data`.
+
+    Every aggregator the stats need is run once on a single shallow copy of the
+    events (aggregators add their column to the frame they are given) and the
+    results are reduced with one groupby into a (matchId, team) x stat table.  Plain
+    functions are called with the events as before and only work on one match.
+    """
+
+    def __init__(self, data, stat_exprs):
+        self.data = data
+        self.keys = ["matchId", "team"] if "matchId" in data.columns else ["team"]
+        totals = {
+            total.key: total
+            for expr in stat_exprs
+            if isinstance(expr, StatExpr)
+            for total in expr.totals()
+        }
+        frame = data.copy(deep=False)
+        columns = {
+            key: np.asarray(total.values(frame)) for key, total in totals.items()
+        }
+        self.totals = (
+            pd.DataFrame(columns, index=np.arange(len(data)))
+            .groupby([data[k].values for k in self.keys])
+            .sum()
         )
-        group = (group[f"{f.col_name}_success"] / group[f.col_name] * 100).to_dict()
-        home = data.loc[data["is_home_team"] == True, "team"].iloc[0]
-        away = data.loc[data["is_home_team"] == False, "team"].iloc[0]
-        return (group[home], group[away])
+        self.totals.index.names = self.keys
+
+    def _team_key(self, is_home: bool):
+        row = self.data.loc[self.data["is_home_team"] == is_home].iloc[0]
+        key = tuple(row[k] for k in self.keys)
+        return key if len(key) > 1 else key[0]
+
+    def column(self, stat_expr: StatExpr) -> pd.Series:
+        return stat_expr.column(self)
+
+    def value(self, stat_expr) -> Tuple[float, float]:
+        """(home, away) value of a stat for a single match"""
+        if isinstance(stat_expr, StatExpr):
+            column = stat_expr.column(self)
+            return (column[self._team_key(True)], column[self._team_key(False)])
+        return stat_expr(self.data)
+
+
+def stat_wrapper(f) -> Total:
+    return Total(f)
+
 
-    return wrapper
+def stat_wrapper_success(f) -> Total:
+    return Total(f, success=True)
 
 
-def tackle_pct_success(dataframe):
-    tackles = stat_wrapper(agg.tackles)(dataframe)
-    tackles_won = stat_wrapper(agg.tackles_successful)(dataframe)
-    return (tackles_won[0] / tackles[0] * 100, tackles_won[1] / tackles[1] * 100)
+def stat_wrapper_success_pct(f) -> SuccessPct:
+    return SuccessPct(Total(f, success=True), Total(f))
+
+
+tackle_pct_success = SuccessPct(Total(agg.tackles_successful), Total(agg.tackles))
 
 
 class MatchStat:
@@ -110,26 +177,19 @@ class MatchStat:
         else:
             return f"{value:.{self.precision}f}"
 
-    def generate(self, data):
+    def _round(self, values):
         if self.precision == 0:
-            return tuple([int(round(v)) for v in self.data_generator_f(data)])
+            return tuple([int(round(v)) for v in values])
         else:
-            return tuple(
-                [round(v, self.precision) for v in self.data_generator_f(data)]
-            )
+            return tuple([round(v, self.precision) for v in values])
 
-    def generate_parenthesis(self, data):
-        if self.precision == 0:
-            return tuple(
-                [int(round(v)) for v in self.parenthesis_data_generator_f(data)]
-            )
-        else:
-            return tuple(
-                [
-                    round(v, self.precision)
-                    for v in self.parenthesis_data_generator_f(data)
-                ]
-            )
+    def generate(self, data, engine: StatEngine = None):
+        engine = engine or StatEngine(data, [self.data_generator_f])
+        return self._round(engine.value(self.data_generator_f))
+
+    def generate_parenthesis(self, data, engine: StatEngine = None):
+        engine = engine or StatEngine(data, [self.parenthesis_data_generator_f])
+        return self._round(engine.value(self.parenthesis_data_generator_f))
 
 
 stats = [
@@ -139,7 +199,7 @@ stats = [
     MatchStat("Big Chances", stat_wrapper(agg.big_chances)),
     MatchStat("NPxG", stat_wrapper(agg.npxg), precision=2),
     MatchStat("NPxG On Target", stat_wrapper(npxgot), precision=2),
-    MatchStat("Pct Possession", agg_minutes, main_pct=True),
+    MatchStat("Pct Possession", PossessionPct(), main_pct=True),
     MatchStat(
         "Passes",
         stat_wrapper(agg.passes),
@@ -171,6 +231,31 @@ stats = [
 ]
 
 
+def match_stat_table(data, match_stats: List[MatchStat] = None) -> pd.DataFrame:
+    """Every match stat for each (matchId, team) in `data`, which can hold many matches.
+
+    Stats with a parenthesis get a second column named after both, e.g.
+    "Passes % complete".  Values are not rounded.
+    """
+    match_stats = match_stats or stats
+    engine = StatEngine(
+        data,
+        [s.data_generator_f for s in match_stats]
+        + [s.parenthesis_data_generator_f for s in match_stats if s.parenthesis],
+    )
+    table = pd.DataFrame(index=engine.totals.index)
+    table["is_home_team"] = data.groupby([data[k].values for k in engine.keys])[
+        "is_home_team"
+    ].first()
+    for match_stat in match_stats:
+        table[match_stat.name] = engine.column(match_stat.data_generator_f)
+        if match_stat.parenthesis:
+            table[f"{match_stat.name} {match_stat.parenthesis}"] = engine.column(
+                match_stat.parenthesis_data_generator_f
+            )
+    return table.reset_index()
+
+
 class MatchSummaryDashboard:
     def __init__(
         self,
@@ -281,6 +366,11 @@ class MatchSummaryDashboard:
         ax3.axis("off")
 
     def draw_data(self, data, ax):
+        engine = StatEngine(
+            data,
+            [s.data_generator_f for s in stats]
+            + [s.parenthesis_data_generator_f for s in stats if s.parenthesis],
+        )
         for i, match_stat in enumerate(stats):
             if match_stat.parenthesis is not None:
 
@@ -294,11 +384,11 @@ class MatchSummaryDashboard:
                     fontproperties=font_bold.prop,
                     fontsize=18,
                 )
-                home_stat, away_stat = match_stat.generate(data)
+                home_stat, away_stat = match_stat.generate(data, engine)
                 (
                     home_parenthesis_stat,
                     away_parenthesis_stat,
-                ) = match_stat.generate_parenthesis(data)
+                ) = match_stat.generate_parenthesis(data, engine)
                 if (home_stat > away_stat and not match_stat.reverse_success) or (
                     (home_stat < away_stat) and match_stat.reverse_success
                 ):
@@ -345,7 +435,7 @@ class MatchSummaryDashboard:
                     fontproperties=font_bold.prop,
                     fontsize=18,
                 )
-                home_stat, away_stat = match_stat.generate(data)
+                home_stat, away_stat = match_stat.generate(data, engine)
                 if (home_stat > away_stat and not match_stat.reverse_success) or (
                     (home_stat < away_stat) and match_stat.reverse_success
                 ):
@@ -415,6 +505,7 @@ class MatchSummaryDashboard:
             fontsize=10,
         )
 
+    @instrumented()
     def draw(self, data):
         fig, ax = self._prep_fig()
         self._draw_top(data, fig, ax)
@@ -422,7 +513,7 @@ class MatchSummaryDashboard:
         self._draw_footer(fig, ax)
         return fig, ax
 
-    def get_data(self, match_id):
+    def _query_events(self, where: str):
         query = f"""
             SELECT 
             W.*,
@@ -441,6 +532,50 @@ class MatchSummaryDashboard:
             LEFT JOIN football_data.mclachbot_leagues LEAGUE ON W.competition = LEAGUE.ws_league_name
             LEFT JOIN football_data.whoscored_meta META ON W.matchId = META.matchId
             LEFT JOIN derived.whoscored_possession_sequence SEQUENCE ON W.id = SEQUENCE.id
-            WHERE W.matchId = {match_id}
+            WHERE {where}
+        """
+        return attach_qualifier_flags(self._connection.wsquery(query))
+
+    def get_data(self, match_id=None, bundle: MatchBundle = None):
+        if bundle is not None:
+            return bundle.events.copy()
+        return self._query_events(f"W.matchId = {match_id}")
+
+    def get_batch_data(self, match_ids: List[int]):
+        match_list = ",".join(str(int(m)) for m in match_ids)
+        return self._query_events(f"W.matchId IN ({match_list})")
+
+    def write_stat_table(
+        self, match_ids: List[int], path: str, matches_per_chunk: int = 10
+    ) -> int:
+        """Write `match_stat_table` for `match_ids` to a Parquet file at `path`.
+
+        Matches are loaded and summarised `matches_per_chunk` at a time and each chunk
+        is appended as a row group, so a season never has to be in memory at once.
+        Returns the number of rows written.
         """
-        return self._connection.wsquery(query)
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        match_ids = list(match_ids)
+        writer = None
+        rows = 0
+        try:
+            for i in range(0, len(match_ids), matches_per_chunk):
+                data = self.get_batch_data(match_ids[i : i + matches_per_chunk])
+                if data.empty:
+                    continue
+                table = match_stat_table(data)
+                stat_columns = table.columns.difference(
+                    ["matchId", "team", "is_home_team"]
+                )
+                table[stat_columns] = table[stat_columns].astype(float)
+                arrow_table = pa.Table.from_pandas(table, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, arrow_table.schema)
+                writer.write_table(arrow_table)
+                rows += len(table)
+        finally:
+            if writer is not None:
+                writer.close()
+        return rows
@@ -5,10 +5,12 @@ from fb_viz.helpers.pitch_helpers import (
     draw_passes_on_axes,
     plot_positional_heatmap_on_pitch,
 )
-from footmav.utils import whoscored_funcs as wf
 import cmasher as cmr
 from fb_viz.dashboards.dashboard import Dashboard, WithFormationDataMixin
+from fb_viz.helpers.data_helpers import attach_passtypes
 from fb_viz.helpers.fonts import font_normal
+from fb_viz.helpers.qualifiers import has_qualifier
+from fb_viz.helpers.instrumentation import stage
 import math
 
 
@@ -77,7 +79,7 @@ class PassingDashboard(WithFormationDataMixin, Dashboard):
         )
         passes = player_data.loc[
             (player_data["event_type"] == EventType.Pass)
-            & (~wf.col_has_qualifier(player_data, qualifier_code=107))
+            & (~has_qualifier(player_data, qualifier_code=107))
         ]
         n_tot = len(passes)
         completed_mask = passes["outcomeType"] == 1
@@ -108,7 +110,9 @@ class PassingDashboard(WithFormationDataMixin, Dashboard):
     def _dashboard_plot_impl(
         self, fig, axes, pitch, data, pitch_color, line_color, marker_base_color
     ):
-        data = data.sort_values(["period", "minute", "second", "eventId"])
+        data = attach_passtypes(
+            data.sort_values(["period", "minute", "second", "eventId"])
+        )
         names = self.extract_names_sorted_by_position(data)
         for i, name in enumerate(names):
             r_i = int(math.floor(i / 3))
@@ -137,19 +141,20 @@ class PassingDashboard(WithFormationDataMixin, Dashboard):
         successful_pass_mask = (
             (data["event_type"] == EventType.Pass)
             & (data["outcomeType"] == 1)
-            & (~wf.col_has_qualifier(data, qualifier_code=107))
-        )
-        pitch.kdeplot(
-            data.loc[successful_pass_mask]["endX"],
-            data.loc[successful_pass_mask]["endY"],
-            ax=axes["pitch"][5][2],
-            levels=50,
-            shade=True,
-            cmap=cmr.amber,
-            thresh=0.1,
-            alpha=0.8,
-            zorder=0,
+            & (~has_qualifier(data, qualifier_code=107))
         )
+        with stage("kdeplot", data.loc[successful_pass_mask], axes["pitch"][5][2]):
+            pitch.kdeplot(
+                data.loc[successful_pass_mask]["endX"],
+                data.loc[successful_pass_mask]["endY"],
+                ax=axes["pitch"][5][2],
+                levels=50,
+                shade=True,
+                cmap=cmr.amber,
+                thresh=0.1,
+                alpha=0.8,
+                zorder=0,
+            )
         axes["pitch"][5][2].text(
             0,
             107,
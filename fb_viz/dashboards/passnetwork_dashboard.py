@@ -6,7 +6,11 @@ from fb_viz.helpers.pitch_helpers import (
 from fb_viz.helpers.fonts import font_normal
 from mplsoccer.pitch import Pitch
 from footmav.data_definitions.whoscored.constants import EventType, PassType
-from fb_viz.helpers.data_helpers import convert_player_name_for_display, lineup_card
+from fb_viz.helpers.data_helpers import (
+    attach_passtypes,
+    convert_player_name_for_display,
+    lineup_card,
+)
 
 
 class PassNetworkDashboard(WithFormationDataMixin, Dashboard):
@@ -151,7 +155,7 @@ class PassNetworkDashboard(WithFormationDataMixin, Dashboard):
     def _dashboard_plot_impl(
         self, fig, axes, pitch: Pitch, data, pitch_color, line_color, marker_base_color
     ):
-
+        attach_passtypes(data)
         plot_average_position_on_pitch_by_position_for_starting_formation(
             axes["pitch"], pitch, data
         )
@@ -3,6 +3,9 @@ from dataclasses import dataclass
 import pandas as pd
 from fb_viz.helpers.fonts import font_normal, font_bold, font_mono
 from fb_viz.helpers.mclachbot_helpers import sportsdb_image_grabber, get_mclachhead
+from fb_viz.helpers.match_bundle import MatchBundle
+from fb_viz.helpers.qualifiers import attach_qualifier_flags
+from fb_viz.helpers.instrumentation import instrumented
 from mplsoccer.pitch import VerticalPitch
 from mplsoccer import add_image
 from matplotlib.figure import Figure
@@ -55,8 +58,22 @@ class HeatmapBars(ABC):
         pitch_cmap = ListedColormap(arr)
         return pitch_cmap
 
+    def _load_events(self, match_id, bundle: MatchBundle = None) -> pd.DataFrame:
+        if bundle is not None:
+            return bundle.events.copy()
+        return attach_qualifier_flags(
+            self._conn.wsquery(
+                f"""SELECT W.*, T.decorated_name, M.home_score, M.away_score FROM whoscored W
+            LEFT JOIN mclachbot_teams T ON W.team=T.ws_team_name
+            LEFT JOIN whoscored_meta M ON W.matchId = M.matchId
+
+            WHERE W.matchId = {match_id}
+            """
+            )
+        )
+
     @abstractmethod
-    def get_data(self, match_id) -> HeatmapData:
+    def get_data(self, match_id=None, bundle: MatchBundle = None) -> HeatmapData:
         pass
 
     def _draw_top(self, data, fig, ax):
@@ -201,6 +218,7 @@ class HeatmapBars(ABC):
                             fontproperties=font_mono.prop,
                         )
 
+    @instrumented()
     def draw(self, heatmap_data: HeatmapData):
         df_dict = heatmap_data.dataframe_success_dict
         bin_stat = heatmap_data.bins_success
@@ -436,15 +454,9 @@ class HeatmapBars(ABC):
 class GroundDuelsPitchArea(HeatmapBars):
     TITLE = "Ground Duels Won By Zone"
 
-    def get_data(self, match_id) -> HeatmapData:
-        data = self._conn.wsquery(
-            f"""SELECT W.*, T.decorated_name, M.home_score, M.away_score FROM whoscored W
-            LEFT JOIN mclachbot_teams T ON W.team=T.ws_team_name
-            LEFT JOIN whoscored_meta M ON W.matchId = M.matchId
-            
-            WHERE W.matchId = {match_id}
-            """
-        )
+    @instrumented()
+    def get_data(self, match_id=None, bundle: MatchBundle = None) -> HeatmapData:
+        data = self._load_events(match_id, bundle)
 
         ground_duels_won_df = data[ground_duels_won(data)]
         ground_duels_lost_df = data[ground_duels_lost(data)]
@@ -495,15 +507,9 @@ class TouchesPitchArea(HeatmapBars):
     SCALE = 50
     PCT_BASED = True
 
-    def get_data(self, match_id) -> HeatmapData:
-        data = self._conn.wsquery(
-            f"""SELECT W.*, T.decorated_name, M.home_score, M.away_score FROM whoscored W
-            LEFT JOIN mclachbot_teams T ON W.team=T.ws_team_name
-            LEFT JOIN whoscored_meta M ON W.matchId = M.matchId
-            
-            WHERE W.matchId = {match_id}
-            """
-        )
+    @instrumented()
+    def get_data(self, match_id=None, bundle: MatchBundle = None) -> HeatmapData:
+        data = self._load_events(match_id, bundle)
 
         touches_df = data[touches(data)]
         df_dict = dict()
@@ -1,9 +1,11 @@
 from mplsoccer import VerticalPitch, set_visible
 from fb_viz.helpers.mplsoccer_helpers import make_grid
 from fb_viz.helpers.mclachbot_helpers import (
-    sportsdb_league_image_grabber,
-    sportsdb_image_grabber,
+    sportsdb_league_badge_url,
+    sportsdb_badge_url,
 )
+from fb_viz.helpers.asset_prefetch import prefetch_images
+from fb_viz.helpers.instrumentation import instrumented
 from fb_viz.helpers.fonts import font_bold, font_normal
 from matplotlib.axes import Axes
 from typing import Dict
@@ -52,7 +54,7 @@ class TeamOfTheWeek:
         )
         return data
 
-    def _draw_title(self, data, pitch: VerticalPitch, ax: Axes):
+    def _draw_title(self, data, pitch: VerticalPitch, ax: Axes, assets: Dict = None):
         ax.set_facecolor(self.kwargs.get("pitch_color", "#333333"))
         ax.text(
             0.05,
@@ -75,7 +77,12 @@ class TeamOfTheWeek:
             fontproperties=font_bold.prop,
         )
 
-        league_image = sportsdb_league_image_grabber(data["comp"].iloc[0])
+        if assets is None:
+            assets = self._fetch_assets(data)
+        league_image = assets.get(("league", data["comp"].iloc[0]))
+        # the badge failed to download
+        if league_image is None:
+            return
 
         ax_width, ax_height = get_ax_size(ax, ax.get_figure())
 
@@ -119,7 +126,9 @@ class TeamOfTheWeek:
             x=0.75, y=0.25, width=0.5, length=0.5, ax=ax
         )
         set_visible(badge_image_inset)
-        badge_image_inset.imshow(team_badges[data_position["squad"].iloc[0]], zorder=5)
+        team_badge = team_badges.get(data_position["squad"].iloc[0])
+        if team_badge is not None:
+            badge_image_inset.imshow(team_badge, zorder=5)
         badge_image_inset.set_facecolor(self.kwargs.get("pitch_color", "#333333"))
         performance_inset = pitch.inset_axes(
             x=0.75, y=0.75, width=0.5, length=0.5, ax=ax
@@ -235,7 +244,8 @@ class TeamOfTheWeek:
             else f"{value:.2f} {display_category}"
         )
 
-    def _get_team_badge_table(self, data):
+    def _asset_urls(self, data) -> Dict:
+        """Every remote image the render needs, keyed by ("league", comp) or ("team", squad)"""
         team_name_table = data[["squad", "image_name_override"]].drop_duplicates()
         team_name_table["team_name_to_use"] = team_name_table.apply(
             lambda r: r["squad"]
@@ -244,13 +254,19 @@ class TeamOfTheWeek:
             axis=1,
         ).tolist()
         league = data["comp"].iloc[0]
-        team_badges = {
-            team_name: sportsdb_image_grabber(team_name_to_use, league)
-            for team_name, team_name_to_use in zip(
-                team_name_table["squad"], team_name_table["team_name_to_use"]
-            )
-        }
-        return team_badges
+        urls = {("league", league): sportsdb_league_badge_url(league)}
+        for team_name, team_name_to_use in zip(
+            team_name_table["squad"], team_name_table["team_name_to_use"]
+        ):
+            urls[("team", team_name)] = sportsdb_badge_url(team_name_to_use, league)
+        return urls
+
+    def _fetch_assets(self, data) -> Dict:
+        return prefetch_images(self._asset_urls(data))
+
+    def _get_team_badge_table(self, data, assets: Dict = None):
+        assets = assets or self._fetch_assets(data)
+        return {name: image for (kind, name), image in assets.items() if kind == "team"}
 
     def _draw_pitch(
         self, data, pitch: VerticalPitch, ax: Axes, team_badges: Dict[str, PngImageFile]
@@ -280,6 +296,7 @@ class TeamOfTheWeek:
                     comp[comp[stat] < row[stat]]
                 ) / len(comp)
 
+    @instrumented()
     def draw(self, week, league, season):
         data = self.get_data(week, league, season)
         ranking_baseline_data = self.get_overall_data(league)
@@ -299,8 +316,9 @@ class TeamOfTheWeek:
         for ax_name in ["title", "endnote"]:
             set_visible(axes[ax_name])
 
-        self._draw_title(data, pitch, axes["title"])
-        team_badges = self._get_team_badge_table(data)
+        assets = self._fetch_assets(data)
+        self._draw_title(data, pitch, axes["title"], assets)
+        team_badges = self._get_team_badge_table(data, assets)
         self._draw_pitch(data, pitch, axes["pitch"], team_badges)
         self._draw_endnote(pitch, axes["endnote"])
         return fig
@@ -1,6 +1,8 @@
 from dataclasses import dataclass
+import numpy as np
+import pandas as pd
 from footmav.data_definitions.whoscored.constants import EventType
-from footmav.utils import whoscored_funcs as WF
+from fb_viz.helpers.qualifiers import has_any_qualifier
 
 
 @dataclass
@@ -34,10 +36,7 @@ def get_attacking_touch_events(data):
                 (data["event_type"] == EventType.Pass)
                 | (data["event_type"] == EventType.OffsidePass)
             )
-            & ~(
-                WF.col_has_qualifier(data, qualifier_code=6)
-                | WF.col_has_qualifier(data, display_name="ThrowIn")
-            )
+            & ~has_any_qualifier(data, [6, 107])
         )  # excludes corners and throw-ins
     ].copy()
     return attacking_touches
@@ -76,10 +75,7 @@ def get_touch_events(data):
                 (data["event_type"] == EventType.Pass)
                 | (data["event_type"] == EventType.OffsidePass)
             )
-            & ~(
-                WF.col_has_qualifier(data, qualifier_code=6)
-                | WF.col_has_qualifier(data, display_name="ThrowIn")
-            )
+            & ~has_any_qualifier(data, [6, 107])
         )  # excludes corners and throw-ins
     ].copy()
     return total_touches
@@ -115,3 +111,26 @@ defensive_events = [
     EventDefinition("Header Lost", EventType.Aerial, 0, "^", "red", "orangered", 1.5),
     EventDefinition("Block", EventType.Save, 1, "s", size_mult=1),
 ]
+
+DEFENSIVE_EVENT_COLUMN = "defensive_event"
+
+
+def defensive_event_codes(data: pd.DataFrame) -> np.ndarray:
+    """Index into `defensive_events` of the definition each row matches, -1 for none"""
+    if DEFENSIVE_EVENT_COLUMN in data.columns:
+        return data[DEFENSIVE_EVENT_COLUMN].values
+    codes = np.full(len(data), -1, dtype=np.int64)
+    event_type = data["event_type"].values
+    outcome_type = data["outcomeType"].values
+    for i, event_definition in enumerate(defensive_events):
+        codes[
+            (event_type == event_definition.event_type)
+            & (outcome_type == event_definition.outcome_type)
+        ] = i
+    return codes
+
+
+def attach_defensive_event_codes(data: pd.DataFrame) -> pd.DataFrame:
+    """Store `defensive_event_codes` as a column so slices of `data` don't recompute it"""
+    data[DEFENSIVE_EVENT_COLUMN] = defensive_event_codes(data)
+    return data
@@ -14,6 +14,8 @@ from footmav.data_definitions.whoscored.constants import EventType
 
 import numpy as np
 
+from fb_viz.helpers.qualifiers import has_qualifier, has_any_qualifier
+
 
 @event_aggregator(suffix="")
 def progressive_pass_distance(dataframe):
@@ -45,11 +47,9 @@ def progressive_carry_distance(dataframe):
 def open_play_passes_completed_into_the_box(dataframe):
     return (
         (dataframe["event_type"] == EventType.Pass)
-        & (WF.col_has_qualifier(dataframe, qualifier_code=2))  # not cross
-        & (~WF.col_has_qualifier(dataframe, qualifier_code=5))  # not free kick
-        & (~WF.col_has_qualifier(dataframe, qualifier_code=6))  # not corner
-        & (~WF.col_has_qualifier(dataframe, qualifier_code=107))  # not throw in
-        & (~WF.col_has_qualifier(dataframe, qualifier_code=123))  # not keeper throw
+        & (has_qualifier(dataframe, qualifier_code=2))  # not cross
+        # not free kick, corner, throw in or keeper throw
+        & (~has_any_qualifier(dataframe, [5, 6, 107, 123]))
         & (WF.into_attacking_box(dataframe))
     )
 
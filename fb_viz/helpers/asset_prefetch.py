@@ -0,0 +1,46 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Dict, Hashable, Optional, Tuple
+
+from PIL import Image
+
+from fb_viz.helpers.image_cache import ImageCache, image_cache
+from fb_viz.helpers.instrumentation import stage
+
+
+def prefetch_images(
+    urls: Dict[Hashable, str],
+    size: Optional[Tuple[int, int]] = None,
+    missing_ok: bool = True,
+    max_workers: int = 8,
+    timeout: float = 10,
+    cache: ImageCache = None,
+) -> Dict[Hashable, Optional[Image.Image]]:
+    """Fetch every image in `urls` concurrently, returning the images under the same keys.
+
+    Images go through the shared image cache so anything already fetched is not
+    requested again.  Failed or timed out downloads map to None when `missing_ok`,
+    otherwise the first error is raised.
+    """
+    cache = cache or image_cache
+
+    def fetch(url):
+        try:
+            return cache.get(url, size=size, missing_ok=missing_ok, timeout=timeout)
+        except OSError:
+            if missing_ok:
+                return None
+            raise
+
+    unique_urls = list(dict.fromkeys(urls.values()))
+    if not unique_urls:
+        return {}
+    with stage("prefetch_images", urls=len(unique_urls)), ThreadPoolExecutor(
+        max_workers=min(max_workers, len(unique_urls))
+    ) as pool:
+        # each fetch runs in a copy of this context so it shows up in an active profile
+        futures = {
+            url: pool.submit(copy_context().run, fetch, url) for url in unique_urls
+        }
+        images = {url: future.result() for url, future in futures.items()}
+    return {key: images[url] for key, url in urls.items()}
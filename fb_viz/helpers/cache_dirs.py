@@ -0,0 +1,9 @@
+import os
+
+
+def default_cache_dir(name: str) -> str:
+    """Location of a named on-disk cache, overridable with FB_VIZ_CACHE_DIR"""
+    root = os.environ.get(
+        "FB_VIZ_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "fb_viz")
+    )
+    return os.path.join(root, name)
@@ -1,5 +1,29 @@
 from footmav.data_definitions.whoscored.constants import EventType
+from footmav.utils import whoscored_funcs as wf
 from tabulate import tabulate
+import numpy as np
+import pandas as pd
+
+
+def attach_passtypes(data):
+    """Make sure `data` has an integer `passtypes` column, classifying passes only when needed.
+
+    A column already on the frame, e.g. joined from derived.whoscored_pass_types, is
+    kept; `wf.classify_passes` is only run when it is missing or lacks some passes.
+    Modifies `data` in place and returns it, so slices taken afterwards carry it.
+    """
+    if "passtypes" not in data.columns:
+        data["passtypes"] = wf.classify_passes(data)
+        return data
+    passtypes = data["passtypes"]
+    if passtypes.dtype.kind not in "iu":
+        # left joined, so rows without a classification come back as NaN
+        if (passtypes.isna() & (data["event_type"] == EventType.Pass)).any():
+            passtypes = passtypes.fillna(
+                pd.Series(np.asarray(wf.classify_passes(data)), index=data.index)
+            )
+        data["passtypes"] = passtypes.fillna(0).astype(np.int64)
+    return data
 
 
 def convert_player_name_for_display(name):
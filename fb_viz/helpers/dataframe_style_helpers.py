@@ -1,8 +1,24 @@
+import functools
+from typing import Tuple
+
 import matplotlib
 import matplotlib.pyplot as plt
 import numpy as np
 
 
+@functools.lru_cache(maxsize=None)
+def colormap_lut(cmap: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Hex colours and their luminance for every entry of a named colormap, with the
+    colormap's 'bad' colour appended for NaN"""
+    colormap = plt.cm.get_cmap(cmap)
+    rgba = np.vstack([colormap(np.arange(colormap.N)), colormap.get_bad()])
+    # rounded to 8 bit, as the hex strings are
+    rgb = np.round(rgba[:, :3] * 255).astype(int)
+    hex_colours = np.array(["#%02x%02x%02x" % tuple(c) for c in rgb], dtype=object)
+    luminance = (rgb / 255) @ np.array([0.2126, 0.7152, 0.0722])
+    return hex_colours, luminance
+
+
 def background_gradient_from_another_column(
     df, column, cmap="PuBu", low=0, high=0, text_luminance_threshold=0.408
 ):
@@ -10,18 +26,14 @@ def background_gradient_from_another_column(
     Color background in a DataFrame depending on the data in another column.
     The colors range from the minimum of `low` or the column to the maximum of `high` or the column.
     """
-
-    def _luminance(r, g, b):
-        return 0.2126 * r + 0.7152 * g + 0.0722 * b
-
+    hex_colours, luminance = colormap_lut(cmap)
+    n_colours = len(hex_colours) - 1
+    values = np.asarray(column.values, dtype=float)
     vmin = min(low, column.min())
     vmax = max(high, column.max())
-    norm = matplotlib.colors.Normalize(vmin=vmin, vmax=vmax)
-    normed = norm(column.values)
-    c = [matplotlib.colors.rgb2hex(x) for x in plt.cm.get_cmap(cmap)(normed)]
-    luminance = np.array([_luminance(*matplotlib.colors.to_rgb(color)) for color in c])
-    mask = luminance > text_luminance_threshold
-    return [
-        "background-color: %s; color: %s" % (color, "black" if m else "white")
-        for color, m in zip(c, mask)
-    ]
+    normed = matplotlib.colors.Normalize(vmin=vmin, vmax=vmax)(values).filled(np.nan)
+    # same indexing as Colormap.__call__, NaN goes to the 'bad' entry at the end
+    idx = np.clip((np.nan_to_num(normed) * n_colours).astype(int), 0, n_colours - 1)
+    idx[np.isnan(normed)] = n_colours
+    text = np.where(luminance[idx] > text_luminance_threshold, "black", "white")
+    return list("background-color: " + hex_colours[idx] + "; color: " + text)
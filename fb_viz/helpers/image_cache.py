@@ -0,0 +1,143 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import numpy as np
+from PIL import Image
+
+from fb_viz.helpers.cache_dirs import default_cache_dir
+from fb_viz.helpers.instrumentation import stage
+
+
+class ImageCache:
+    """Two level cache for remote images.
+
+    Decoded (and optionally resized) pixel arrays are kept in an in-memory LRU and
+    as ``.npy`` files on disk, addressed by a hash of the url and target size, so a
+    warm render neither downloads nor decodes anything.  404 responses are cached
+    as well, for `negative_ttl` seconds, so missing badges are not requested on
+    every render.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = None,
+        max_items: int = 256,
+        negative_ttl: float = 24 * 60 * 60,
+        timeout: float = 10,
+    ):
+        self.cache_dir = cache_dir or default_cache_dir("images")
+        self.max_items = max_items
+        self.negative_ttl = negative_ttl
+        self.timeout = timeout
+        self.downloads = 0
+        self._memory = OrderedDict()
+        self._missing = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(url: str, size: Optional[Tuple[int, int]]) -> str:
+        return hashlib.sha256(f"{url}|{size}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str, ext: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.{ext}")
+
+    def get(
+        self,
+        url: str,
+        size: Optional[Tuple[int, int]] = None,
+        missing_ok: bool = False,
+        timeout: float = None,
+    ) -> Optional[Image.Image]:
+        """Image at `url`, fitted inside `size` if given.
+
+        Failed downloads return None when `missing_ok`, otherwise the HTTPError is raised.
+        """
+        key = self._key(url, size)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+        if self._is_missing(key):
+            if missing_ok:
+                return None
+            raise HTTPError(url, 404, "Not Found (cached)", None, None)
+
+        image = self._load_from_disk(key)
+        if image is None:
+            try:
+                image = self._download(url, size, timeout or self.timeout)
+            except HTTPError as e:
+                if e.code == 404:
+                    self._mark_missing(key)
+                if missing_ok:
+                    return None
+                raise
+            self._save_to_disk(key, image)
+        self._remember(key, image)
+        return image
+
+    def clear_memory(self):
+        with self._lock:
+            self._memory.clear()
+            self._missing.clear()
+
+    def _remember(self, key: str, image: Image.Image):
+        with self._lock:
+            self._memory[key] = image
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_items:
+                self._memory.popitem(last=False)
+
+    def _download(self, url: str, size, timeout: float) -> Image.Image:
+        self.downloads += 1
+        with stage("image download", url=url):
+            image = Image.open(urlopen(url, timeout=timeout))
+            if image.mode not in ("RGB", "RGBA", "L", "LA"):
+                image = image.convert("RGBA")
+            if size is not None:
+                image.thumbnail(size)
+            image.load()
+        return image
+
+    def _load_from_disk(self, key: str) -> Optional[Image.Image]:
+        try:
+            return Image.fromarray(np.load(self._path(key, "npy"), allow_pickle=False))
+        except (OSError, ValueError):
+            return None
+
+    def _save_to_disk(self, key: str, image: Image.Image):
+        path = self._path(key, "npy")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as fp:
+            np.save(fp, np.asarray(image), allow_pickle=False)
+        os.replace(tmp_path, path)
+
+    def _is_missing(self, key: str) -> bool:
+        marked_at = self._missing.get(key)
+        if marked_at is None:
+            try:
+                marked_at = os.path.getmtime(self._path(key, "missing"))
+            except OSError:
+                return False
+            self._missing[key] = marked_at
+        if time.time() - marked_at > self.negative_ttl:
+            self._missing.pop(key, None)
+            return False
+        return True
+
+    def _mark_missing(self, key: str):
+        self._missing[key] = time.time()
+        path = self._path(key, "missing")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w"):
+            pass
+
+
+image_cache = ImageCache()
@@ -0,0 +1,179 @@
+"""Opt-in per-stage timing for renders.
+
+Nothing is recorded unless a :class:`RenderProfiler` is active::
+
+    with RenderProfiler() as profiler:
+        dashboard.plot(dashboard.get_data(team, date))
+    print(profiler.summary_table())
+    profiler.write_chrome_trace("render.trace.json")  # open in chrome://tracing
+
+Stages nest, and each one records wall time, the number of rows of the first
+dataframe it was given and the number of matplotlib artists it added to the first
+axes or figure it was given.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import pandas as pd
+from matplotlib.axes import Axes
+from matplotlib.figure import Figure
+
+_active_profiler: ContextVar[Optional["RenderProfiler"]] = ContextVar(
+    "fb_viz_profiler", default=None
+)
+_depth: ContextVar[int] = ContextVar("fb_viz_profiler_depth", default=0)
+
+
+@dataclass
+class StageRecord:
+    name: str
+    start: float
+    depth: int
+    thread: int
+    duration: float = 0.0
+    rows: Optional[int] = None
+    artists: Optional[int] = None
+    args: Dict = field(default_factory=dict)
+
+
+def _count_artists(target) -> Optional[int]:
+    if isinstance(target, Axes):
+        return len(target.get_children())
+    if isinstance(target, Figure):
+        return len(target.get_children()) + sum(
+            len(ax.get_children()) for ax in target.axes
+        )
+    return None
+
+
+class RenderProfiler:
+    def __init__(self):
+        self.records: List[StageRecord] = []
+        self._origin = time.perf_counter()
+        self._token = None
+
+    def __enter__(self) -> "RenderProfiler":
+        self._token = _active_profiler.set(self)
+        return self
+
+    def __exit__(self, *exc):
+        _active_profiler.reset(self._token)
+
+    def to_chrome_trace(self) -> Dict:
+        pid = os.getpid()
+        return {
+            "traceEvents": [
+                {
+                    "name": r.name,
+                    "ph": "X",
+                    "ts": r.start * 1e6,
+                    "dur": r.duration * 1e6,
+                    "pid": pid,
+                    "tid": r.thread,
+                    "args": dict(r.args, rows=r.rows, artists=r.artists),
+                }
+                for r in self.records
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def write_chrome_trace(self, path: str):
+        with open(path, "w") as fp:
+            json.dump(self.to_chrome_trace(), fp)
+
+    def summary(self) -> pd.DataFrame:
+        """One row per stage name, slowest first"""
+        columns = ["stage", "calls", "seconds", "mean_seconds", "rows", "artists"]
+        if not self.records:
+            return pd.DataFrame(columns=columns)
+        df = pd.DataFrame(
+            [
+                dict(stage=r.name, seconds=r.duration, rows=r.rows, artists=r.artists)
+                for r in self.records
+            ]
+        )
+        summary = df.groupby("stage", sort=False).agg(
+            calls=("seconds", "size"),
+            seconds=("seconds", "sum"),
+            mean_seconds=("seconds", "mean"),
+            rows=("rows", lambda x: x.sum(min_count=1)),
+            artists=("artists", lambda x: x.sum(min_count=1)),
+        )
+        return summary.sort_values("seconds", ascending=False).reset_index()[columns]
+
+    def summary_table(self) -> str:
+        from tabulate import tabulate
+
+        summary = self.summary()
+        rows = [
+            [r.stage, r.calls, r.seconds, r.mean_seconds]
+            + [None if pd.isna(v) else int(v) for v in (r.rows, r.artists)]
+            for r in summary.itertuples()
+        ]
+        return tabulate(
+            rows, headers=list(summary.columns), floatfmt=".3f", missingval=""
+        )
+
+
+def active_profiler() -> Optional[RenderProfiler]:
+    return _active_profiler.get()
+
+
+@contextmanager
+def stage(name: str, data: pd.DataFrame = None, target=None, **args):
+    """Time the block as `name` if a profiler is active.
+
+    `data` is the dataframe the stage works on and `target` the axes or figure it
+    draws on; the yielded record (None when not profiling) can be updated in the block.
+    """
+    profiler = _active_profiler.get()
+    if profiler is None:
+        yield None
+        return
+    depth = _depth.get()
+    record = StageRecord(
+        name,
+        time.perf_counter() - profiler._origin,
+        depth,
+        threading.get_ident(),
+        rows=len(data) if data is not None else None,
+        args=args,
+    )
+    artists_before = _count_artists(target)
+    token = _depth.set(depth + 1)
+    try:
+        yield record
+    finally:
+        _depth.reset(token)
+        record.duration = time.perf_counter() - profiler._origin - record.start
+        if artists_before is not None:
+            record.artists = _count_artists(target) - artists_before
+        profiler.records.append(record)
+
+
+def instrumented(name: str = None):
+    """Decorator form of `stage`, picking the first dataframe and axes/figure argument"""
+
+    def decorator(f):
+        stage_name = name or f.__qualname__
+
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            if _active_profiler.get() is None:
+                return f(*args, **kwargs)
+            values = list(args) + list(kwargs.values())
+            data = next((v for v in values if isinstance(v, pd.DataFrame)), None)
+            target = next((v for v in values if isinstance(v, (Axes, Figure))), None)
+            with stage(stage_name, data, target):
+                return f(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,138 @@
+import pandas as pd
+
+from fb_viz.helpers.data_helpers import attach_passtypes
+from fb_viz.helpers.instrumentation import stage
+from fb_viz.helpers.qualifiers import QUALIFIER_BITS_COLUMN, attach_qualifier_flags
+
+
+class MatchBundle:
+    """All events for a single match, fetched once and shared by every dashboard.
+
+    The event query joins the union of the derived tables the individual
+    dashboards used to query separately, so rendering several graphics for the
+    same match costs one round trip.  Implied carries live in a separate table
+    with a different shape and are only fetched when a dashboard asks for them.
+    """
+
+    EVENT_QUERY = """
+        SELECT W.*,
+        E.formation, E.position, E.shirt_number, E.pass_receiver, E.pass_receiver_shirt_number, E.pass_receiver_position,
+        E.id IS NOT NULL AS has_extra_event_info,
+        G.game_state,
+        P.passtypes,
+        X.value AS xT,
+        XG.xg AS xG,
+        SEQUENCE.possession_number,
+        TEAM.decorated_name,
+        LEAGUE.decorated_name AS league_decorated_name,
+        META.home_score, META.away_score,
+        IF(W.is_home_team=True, META.home_score, META.away_score) AS team_score,
+        IF(W.is_home_team=True, META.away_score, META.home_score) AS opponent_score
+        FROM football_data.whoscored W
+        LEFT JOIN derived.whoscored_extra_event_info E
+        ON W.id = E.id
+        LEFT JOIN derived.whoscored_game_state G
+        ON W.id = G.id
+        LEFT JOIN derived.whoscored_pass_types P
+        ON W.id = P.id
+        LEFT JOIN derived.whoscored_xthreat X
+        ON W.id = X.id
+        LEFT JOIN derived.whoscored_shot_data XG
+        ON W.id = XG.id
+        LEFT JOIN derived.whoscored_possession_sequence SEQUENCE
+        ON W.id = SEQUENCE.id
+        LEFT JOIN football_data.mclachbot_teams TEAM ON W.team = TEAM.ws_team_name
+        LEFT JOIN football_data.mclachbot_leagues LEAGUE ON W.competition = LEAGUE.ws_league_name
+        LEFT JOIN football_data.whoscored_meta META ON W.matchId = META.matchId
+        WHERE W.matchId = {match_id}
+        ORDER BY W.period, W.minute, W.second, W.eventId
+        """
+    CARRIES_QUERY = """
+        SELECT eventId,minute,second,x,y,qualifiers,period,event_type,outcomeType,endX,endY,matchId,season,competition,player_name,match_seconds,team,opponent,is_home_team,sub_id, carryId FROM derived.whoscored_implied_carries_v2
+        WHERE matchId={match_id}
+        """
+    MATCH_DAY_QUERY = """
+        SELECT matchId FROM football_data.whoscored_meta
+        WHERE match_date = '{date}' AND (home = '{team}' OR away = '{team}')
+        """
+    POSITIONS_QUERY = "SELECT * FROM football_data.whoscored_positions"
+
+    def __init__(self, match_id: int, events: pd.DataFrame, connection=None):
+        self.match_id = match_id
+        self.events = events
+        if QUALIFIER_BITS_COLUMN not in events.columns:
+            attach_qualifier_flags(events)
+        attach_passtypes(events)
+        self._connection = connection
+        self._carries = None
+        self._positions = None
+
+    @classmethod
+    def load(cls, connection, match_id: int) -> "MatchBundle":
+        with stage("MatchBundle.load"):
+            events = connection.wsquery(cls.EVENT_QUERY.format(match_id=match_id))
+        return cls(match_id, events, connection)
+
+    @classmethod
+    def load_for_team(cls, connection, team: str, date: str) -> "MatchBundle":
+        match_id = connection.query(cls.MATCH_DAY_QUERY.format(date=date, team=team))[
+            "matchId"
+        ].iloc[0]
+        return cls.load(connection, match_id)
+
+    @property
+    def home_team(self) -> str:
+        return self.events.loc[self.events["is_home_team"] == True, "team"].iloc[0]
+
+    @property
+    def away_team(self) -> str:
+        return self.events.loc[self.events["is_home_team"] == False, "team"].iloc[0]
+
+    def decorated_name(self, team: str) -> str:
+        return self.events.loc[self.events["team"] == team, "decorated_name"].iloc[0]
+
+    @property
+    def carries(self) -> pd.DataFrame:
+        if self._carries is None:
+            with stage("MatchBundle.carries"):
+                self._carries = attach_qualifier_flags(
+                    self._connection.wsquery(
+                        self.CARRIES_QUERY.format(match_id=self.match_id)
+                    )
+                )
+        return self._carries
+
+    @property
+    def positions(self) -> pd.DataFrame:
+        if self._positions is None:
+            with stage("MatchBundle.positions"):
+                self._positions = self._connection.query(self.POSITIONS_QUERY)
+        return self._positions
+
+    def team_events(self, team: str) -> pd.DataFrame:
+        """Events for one team, restricted to those with lineup information"""
+        return self.events.loc[
+            (self.events["team"] == team)
+            & (self.events["has_extra_event_info"].astype(bool))
+        ].reset_index(drop=True)
+
+    def events_with_carries(self) -> pd.DataFrame:
+        data1 = self.events.copy()
+        data1["sub_id"] = 1
+        data = pd.concat([data1, self.carries])
+        data["sub_id"] = data["sub_id"].fillna(1)
+        return data.sort_values(["period", "minute", "second", "eventId", "sub_id"])
+
+    def team_display_info(self, team: str) -> dict:
+        """Names used by the dashboard headers for `team` and its opponent"""
+        home, away = self.home_team, self.away_team
+        opponent = away if team == home else home
+        return dict(
+            home_away="Home" if team == home else "Away",
+            team=team,
+            team_image_name=team.replace(".", "").lower(),
+            team_display_name=self.decorated_name(team),
+            opponent=opponent,
+            opponent_image_name=opponent.replace(".", "").lower(),
+            opponent_display_name=self.decorated_name(opponent),
+        )
@@ -1,80 +1,61 @@
-from typing import Dict, List
-from urllib.error import HTTPError
+from typing import Tuple
 from PIL import Image
-from urllib.request import urlopen
-import requests
-import json
+from fb_viz.helpers.image_cache import image_cache
+from fb_viz.helpers.team_colour_helpers import team_colours
 
+MCLACHHEAD_URL = (
+    "https://pbs.twimg.com/profile_images/1625635168324050944/Q4K7dWO1_400x400.jpg"
+)
+TWITTER_IMAGE_URL = "http://mclachbot.com/site/img/twitter.png"
+INSTA_IMAGE_URL = "http://mclachbot.com/site/img/instagram.webp"
 
-def get_image_remote(team_name: str, league: str) -> Image:
-    url = f"http://www.mclachbot.com/site/img/teams/{league}/{team_name}.png"
-    return Image.open(urlopen(url))
 
-
-def get_mclachhead() -> Image:
-    return Image.open(
-        urlopen(
-            "https://pbs.twimg.com/profile_images/1625635168324050944/Q4K7dWO1_400x400.jpg"
-        )
-    )
+def team_image_url(team_name: str, league: str) -> str:
+    return f"http://www.mclachbot.com/site/img/teams/{league}/{team_name}.png"
 
 
-def sportsdb_image_grabber(team: str, league: str):
+def sportsdb_badge_url(team: str, league: str) -> str:
     league = league.replace(" ", "%20")
     team = team.replace(" ", "%20")
-    url = f"http://www.mclachbot.com:9000/badge_download/{league}/{team}"
-    try:
-        return Image.open(urlopen(url))
-    except HTTPError:
-        return None
+    return f"http://www.mclachbot.com:9000/badge_download/{league}/{team}"
 
 
-def sportsdb_league_image_grabber(league: str):
+def sportsdb_league_badge_url(league: str) -> str:
     league = league.replace(" ", "%20")
+    return f"http://www.mclachbot.com:9000/league_badge_download/{league}"
 
-    url = f"http://www.mclachbot.com:9000/league_badge_download/{league}"
-    try:
-        return Image.open(urlopen(url))
-    except HTTPError:
-        return None
 
+def rainbow_image_url(version="") -> str:
+    return f"http://mclachbot.com/site/img/rainbow{version}.png"
 
-def get_rainbow_image(version=""):
-    image = Image.open(urlopen(f"http://mclachbot.com/site/img/rainbow{version}.png"))
-    return image
 
+def get_image_remote(
+    team_name: str, league: str, size: Tuple[int, int] = None
+) -> Image:
+    return image_cache.get(team_image_url(team_name, league), size=size)
 
-def team_colours(
-    team: str,
-    league: str,
-    existing_map: Dict[str, List[str]] = None,
-    default_colours: List[str] = None,
-) -> List[str]:
-    default_colours = default_colours or ["#bbbbbb", "#000000"]
-    existing_map = existing_map or {}
 
-    league = league.replace(" ", "%20")
-    team = team.replace(" ", "%20")
-    url = f"http://www.mclachbot.com:9000/colours/{league}/{team}"
-    try:
-        r = requests.get(url)
-        if r.status_code == 200:
-            colours = json.loads(r.text)
-            if not colours[0]:
-                return default_colours
-            return colours
-        else:
-            return default_colours
+def get_mclachhead(size: Tuple[int, int] = None) -> Image:
+    return image_cache.get(MCLACHHEAD_URL, size=size)
+
+
+def sportsdb_image_grabber(team: str, league: str, size: Tuple[int, int] = None):
+    return image_cache.get(sportsdb_badge_url(team, league), size=size, missing_ok=True)
+
+
+def sportsdb_league_image_grabber(league: str, size: Tuple[int, int] = None):
+    return image_cache.get(
+        sportsdb_league_badge_url(league), size=size, missing_ok=True
+    )
+
 
-    except HTTPError:
-        return None
+def get_rainbow_image(version="", size: Tuple[int, int] = None):
+    return image_cache.get(rainbow_image_url(version), size=size)
 
 
-def get_twitter_image():
-    image = Image.open(urlopen("http://mclachbot.com/site/img/twitter.png"))
-    return image
+def get_twitter_image(size: Tuple[int, int] = None):
+    return image_cache.get(TWITTER_IMAGE_URL, size=size)
 
 
-def get_insta_image():
-    image = Image.open(urlopen("http://mclachbot.com/site/img/instagram.webp"))
-    return image
+def get_insta_image(size: Tuple[int, int] = None):
+    return image_cache.get(INSTA_IMAGE_URL, size=size)
@@ -0,0 +1,51 @@
+"""Outlier strategies for trimming point clouds before drawing a convex hull.
+
+A strategy takes an (n, 2) array of coordinates and the fraction of points to treat
+as outliers, and returns a boolean mask of the points to keep.
+"""
+from typing import Callable, Dict, Union
+
+import numpy as np
+
+OutlierStrategy = Callable[[np.ndarray, float], np.ndarray]
+
+
+def mahalanobis_inliers(xy: np.ndarray, outlier_ratio: float) -> np.ndarray:
+    """Drop the `outlier_ratio` share of points furthest from the centre of the cloud,
+    measured in standard deviations along its principal axes"""
+    n_outliers = int(len(xy) * outlier_ratio)
+    keep = np.ones(len(xy), dtype=bool)
+    if n_outliers == 0:
+        return keep
+    offsets = xy - xy.mean(axis=0)
+    # pinv so that points along a single line don't raise
+    inverse_covariance = np.linalg.pinv(np.cov(xy, rowvar=False))
+    distances = np.einsum("ij,jk,ik->i", offsets, inverse_covariance, offsets)
+    keep[np.argpartition(distances, -n_outliers)[-n_outliers:]] = False
+    return keep
+
+
+def isolation_forest_inliers(xy: np.ndarray, outlier_ratio: float) -> np.ndarray:
+    """sklearn's IsolationForest, as the hulls were originally drawn"""
+    from sklearn.ensemble import IsolationForest
+
+    model = IsolationForest(contamination=outlier_ratio, random_state=0)
+    return model.fit_predict(xy) == 1
+
+
+OUTLIER_STRATEGIES: Dict[str, OutlierStrategy] = {
+    "mahalanobis": mahalanobis_inliers,
+    "isolation_forest": isolation_forest_inliers,
+}
+
+
+def get_outlier_strategy(strategy: Union[str, OutlierStrategy]) -> OutlierStrategy:
+    if callable(strategy):
+        return strategy
+    try:
+        return OUTLIER_STRATEGIES[strategy]
+    except KeyError:
+        raise ValueError(
+            f"Unknown outlier strategy {strategy!r}, "
+            f"expected one of {list(OUTLIER_STRATEGIES)} or a callable"
+        )
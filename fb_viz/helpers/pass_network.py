@@ -0,0 +1,150 @@
+from typing import Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from footmav.data_definitions.whoscored.constants import EventType, PassType
+
+from fb_viz.definitions.events import get_touch_events
+from fb_viz.helpers.data_helpers import attach_passtypes
+from fb_viz.helpers.match_bundle import MatchBundle
+
+
+class PassNetworkAccumulator:
+    """Position based pass networks for one team, averaged over many matches.
+
+    Matches are added one at a time and only running totals per formation are kept:
+    completed passes and progressive passes per (formation, position pair) and
+    touch counts and coordinate sums per (formation, position).  `pass_network`
+    and `locations` return frames shaped like `get_starter_pass_network_by_position`
+    and `get_locations_by_starting_formation`, so they can be drawn with
+    `draw_pass_network` and `draw_average_positions`.
+    """
+
+    RECENT_MATCHES_QUERY = """
+        SELECT matchId FROM football_data.whoscored_meta
+        WHERE (home = '{team}' OR away = '{team}') {date_filter}
+        ORDER BY match_date DESC
+        LIMIT {n}
+        """
+
+    def __init__(self):
+        self.matches = pd.Series(dtype=np.int64, name="matches")
+        self._pairs = pd.DataFrame(
+            columns=["count", "progressive_count"],
+            index=pd.MultiIndex.from_arrays(
+                [[], [], []], names=["formation", "player", "receiver"]
+            ),
+            dtype=float,
+        )
+        self._locations = pd.DataFrame(
+            columns=["count", "x_sum", "y_sum"],
+            index=pd.MultiIndex.from_arrays([[], []], names=["formation", "position"]),
+            dtype=float,
+        )
+
+    def add_match(self, data: pd.DataFrame) -> "PassNetworkAccumulator":
+        """Add one match's events for the team, with `formation` and `position` columns"""
+        attach_passtypes(data)
+        formations = data["formation"].dropna().unique()
+        self.matches = self.matches.add(
+            pd.Series(1, index=formations), fill_value=0
+        ).astype(np.int64)
+
+        passes = data.loc[
+            (data["event_type"] == EventType.Pass)
+            & (data["outcomeType"] == 1)
+            & (data["formation"].notnull())
+            & (data["pass_receiver_position"].notnull())
+            & (data["position"].notnull())
+        ]
+        passer = passes["position"].to_numpy(dtype=object)
+        receiver = passes["pass_receiver_position"].to_numpy(dtype=object)
+        first = passer <= receiver
+        pairs = (
+            pd.DataFrame(
+                {
+                    "formation": passes["formation"].to_numpy(),
+                    "player": np.where(first, passer, receiver),
+                    "receiver": np.where(first, receiver, passer),
+                    "count": 1,
+                    "progressive_count": (
+                        passes["passtypes"].to_numpy(dtype=np.int64)
+                        & (1 << (PassType.PROGRESSIVE.value - 1))
+                    )
+                    > 0,
+                }
+            )
+            .groupby(["formation", "player", "receiver"])
+            .sum()
+        )
+        self._pairs = self._pairs.add(pairs, fill_value=0)
+
+        touches = get_touch_events(
+            data.loc[data["formation"].notnull() & data["position"].notnull()]
+        )
+        locations = touches.groupby(["formation", "position"]).agg(
+            count=("x", "count"), x_sum=("x", "sum"), y_sum=("y", "sum")
+        )
+        self._locations = self._locations.add(locations, fill_value=0)
+        return self
+
+    def extend(self, matches: Iterable[pd.DataFrame]) -> "PassNetworkAccumulator":
+        for data in matches:
+            self.add_match(data)
+        return self
+
+    @classmethod
+    def recent_match_ids(
+        cls, connection, team: str, n: int, before: str = None
+    ) -> List[int]:
+        date_filter = f"AND match_date < '{before}'" if before else ""
+        return connection.query(
+            cls.RECENT_MATCHES_QUERY.format(team=team, date_filter=date_filter, n=n)
+        )["matchId"].tolist()
+
+    @classmethod
+    def load(
+        cls, connection, team: str, match_ids: Iterable[int]
+    ) -> "PassNetworkAccumulator":
+        """Accumulate `team`'s matches, loading and discarding one match at a time"""
+        return cls().extend(
+            MatchBundle.load(connection, match_id).team_events(team)
+            for match_id in match_ids
+        )
+
+    def most_common_formation(self) -> Optional[str]:
+        if self.matches.empty:
+            return None
+        return self.matches.idxmax()
+
+    def _formation(self, formation):
+        return self.most_common_formation() if formation is None else formation
+
+    def pass_network(
+        self, formation=None, min_combinations: float = 3, per_match: bool = True
+    ) -> pd.DataFrame:
+        """Passes per position pair in `formation` (the most common by default),
+        averaged per match played in it unless `per_match` is False"""
+        formation = self._formation(formation)
+        if formation not in self._pairs.index.get_level_values("formation"):
+            return pd.DataFrame(
+                columns=["count", "player", "receiver", "progressive_count"]
+            )
+        pairs = self._pairs.xs(formation, level="formation").reset_index()
+        if per_match:
+            pairs[["count", "progressive_count"]] /= self.matches[formation]
+        pairs = pairs[["count", "player", "receiver", "progressive_count"]]
+        return pairs.loc[pairs["count"] >= min_combinations].reset_index(drop=True)
+
+    def locations(self, formation=None, per_match: bool = True) -> pd.DataFrame:
+        """Average touch location per position in `formation`, with `count` touches
+        per match unless `per_match` is False"""
+        formation = self._formation(formation)
+        if formation not in self._locations.index.get_level_values("formation"):
+            return pd.DataFrame(columns=["position", "count", "x", "y"])
+        locations = self._locations.xs(formation, level="formation").reset_index()
+        locations["x"] = locations["x_sum"] / locations["count"]
+        locations["y"] = locations["y_sum"] / locations["count"]
+        if per_match:
+            locations["count"] /= self.matches[formation]
+        return locations[["position", "count", "x", "y"]]
@@ -1,21 +1,25 @@
 from footmav.data_definitions.whoscored.constants import EventType, PassType
-from footmav.utils import whoscored_funcs as WF
+from typing import Union
 import pandas as pd
 import matplotlib.pyplot as plt
 from mplsoccer.pitch import Pitch
 from fb_viz.definitions.events import (
     EventDefinition,
+    defensive_event_codes,
     defensive_events,
     get_touch_events,
 )
-from sklearn.ensemble import IsolationForest
+from matplotlib.collections import LineCollection
 from matplotlib.lines import Line2D
 import numpy as np
 from math import ceil
+from fb_viz.helpers.data_helpers import attach_passtypes
 from fb_viz.helpers.fonts import font_normal
 from fb_viz.helpers.team_colour_helpers import team_colours
-from matplotlib.colors import to_rgba
-from footmav.utils import whoscored_funcs as wf
+from fb_viz.helpers.qualifiers import has_qualifier
+from fb_viz.helpers.instrumentation import instrumented
+from fb_viz.helpers.outliers import OutlierStrategy, get_outlier_strategy
+from matplotlib.colors import to_rgba, to_rgba_array
 import matplotlib.patheffects as path_effects
 
 
@@ -34,15 +38,36 @@ def apply_event_plot(
         (data["event_type"] == event_definition.event_type)
         & (data["outcomeType"] == event_definition.outcome_type)
     ]
-
-    pitch.scatter(
+    _scatter_event(
+        pitch,
+        ax,
         sub_data["x"],
         sub_data["y"],
+        event_definition,
+        size,
+        base_color,
+        base_edge_color,
+    )
+
+
+def _scatter_event(
+    pitch: Pitch,
+    ax,
+    x,
+    y,
+    event_definition: EventDefinition,
+    size: int,
+    base_color: str,
+    base_edge_color: str,
+):
+    pitch.scatter(
+        x,
+        y,
         marker=event_definition.marker,
         color=event_definition.color if event_definition.color else base_color,
-        edgecolors=[event_definition.edge_color] * sub_data.shape[0]
+        edgecolors=[event_definition.edge_color] * len(x)
         if event_definition.edge_color
-        else [base_edge_color] * sub_data.shape[0],
+        else [base_edge_color] * len(x),
         ax=ax,
         s=size * event_definition.size_mult,
         alpha=0.7,
@@ -51,124 +76,99 @@ def apply_event_plot(
     )
 
 
+# line colours for draw_passes_on_axes by pass category (regular, progressive,
+# cutback), for completed and incomplete passes
+PASS_LINE_COLORS = {
+    1: ["lightcoral", "lightblue", "lightgreen"],
+    0: ["darkred", "blue", "green"],
+}
+
+
+def pass_category_codes(passes: pd.DataFrame) -> np.ndarray:
+    """0 for regular passes, 1 for progressive passes, 2 for cutbacks, -1 otherwise"""
+    passtypes = passes["passtypes"].values
+    return np.select(
+        [passtypes % 2 == 1, passtypes == 2, passtypes == 0], [2, 1, 0], default=-1
+    )
+
+
+def _comet_lines(
+    ax: plt.Axes,
+    pitch: Pitch,
+    xstart,
+    ystart,
+    xend,
+    yend,
+    colors,
+    linewidth: float,
+    alpha: float = None,
+    n_segments: int = 100,
+    **kwargs,
+):
+    """Like `pitch.lines(comet=True, transparent=True)`, but with a colour per line.
+
+    Each line is split into `n_segments` that widen from 1 to `linewidth` and, unless
+    a fixed `alpha` is given, fade in from transparent, all in a single LineCollection.
+    """
+    if pitch.vertical:
+        xstart, ystart, xend, yend = ystart, xstart, yend, xend
+    steps = np.linspace(0, 1, n_segments + 1)
+    x = xstart[:, None] + (xend - xstart)[:, None] * steps
+    y = ystart[:, None] + (yend - ystart)[:, None] * steps
+    points = np.stack([x, y], axis=-1)
+    segments = np.stack([points[:, :-1], points[:, 1:]], axis=2).reshape(-1, 2, 2)
+
+    segment_colors = np.repeat(to_rgba_array(colors), n_segments, axis=0)
+    segment_colors[:, 3] = (
+        alpha
+        if alpha is not None
+        else np.tile(np.linspace(0.01, 1, n_segments), len(xstart))
+    )
+    collection = LineCollection(
+        segments,
+        colors=segment_colors,
+        linewidths=np.tile(np.linspace(1, linewidth, n_segments), len(xstart)),
+        snap=False,
+        **kwargs,
+    )
+    return ax.add_collection(collection)
+
+
+@instrumented()
 def draw_passes_on_axes(
     ax: plt.Axes,
     data: pd.DataFrame,
     pitch: Pitch,
     linewidth: float = 3,
 ):
-    data["passtypes"] = wf.classify_passes(data)
+    """Draw passes as comet lines, coloured by category and outcome.
+
+    Completed passes are drawn as one collection and incomplete ones, at a fixed
+    alpha under them, as another.
+    """
+    attach_passtypes(data)
     passes = data.loc[
         (data["event_type"] == EventType.Pass)
-        & (~wf.col_has_qualifier(data, qualifier_code=107))
-    ]
-    regular_pass_complete = passes.loc[
-        (passes["outcomeType"] == 1) & (passes["passtypes"] == 0)
-    ]
-    regular_pass_incomplete = passes.loc[
-        (passes["outcomeType"] == 0) & (passes["passtypes"] == 0)
+        & (~has_qualifier(data, qualifier_code=107))
     ]
-    progressive_pass_complete = passes.loc[
-        (passes["outcomeType"] == 1) & (passes["passtypes"] == 2)
-    ]
-    progressive_pass_incomplete = passes.loc[
-        (passes["outcomeType"] == 0) & (passes["passtypes"] == 2)
-    ]
-    cutbacks_complete = passes.loc[
-        (passes["outcomeType"] == 1) & (passes["passtypes"] % 2 == 1)
-    ]
-    cutbacks_incomplete = passes.loc[
-        (passes["outcomeType"] == 0) & (passes["passtypes"] % 2 == 1)
-    ]
-    if regular_pass_complete.shape[0] > 0:
-        pitch.lines(
-            regular_pass_complete["x"],
-            regular_pass_complete["y"],
-            regular_pass_complete["endX"],
-            regular_pass_complete["endY"],
-            lw=linewidth,
-            transparent=True,
-            comet=True,
-            label="completed passes",
-            capstyle="round",
-            color="lightcoral",
-            ax=ax,
-            zorder=3,
-        )
-    if regular_pass_incomplete.shape[0] > 0:
-        pitch.lines(
-            regular_pass_incomplete["x"],
-            regular_pass_incomplete["y"],
-            regular_pass_incomplete["endX"],
-            regular_pass_incomplete["endY"],
-            lw=linewidth,
-            transparent=True,
-            comet=True,
-            label="incomplete passes",
-            capstyle="round",
-            color="darkred",
-            ax=ax,
-            alpha=0.6,
-        )
-    if progressive_pass_complete.shape[0] > 0:
-        pitch.lines(
-            progressive_pass_complete["x"],
-            progressive_pass_complete["y"],
-            progressive_pass_complete["endX"],
-            progressive_pass_complete["endY"],
-            lw=linewidth,
-            transparent=True,
-            comet=True,
-            label="completed progressive passes",
-            capstyle="round",
-            color="lightblue",
-            ax=ax,
-            zorder=3,
-        )
-    if progressive_pass_incomplete.shape[0] > 0:
-        pitch.lines(
-            progressive_pass_incomplete["x"],
-            progressive_pass_incomplete["y"],
-            progressive_pass_incomplete["endX"],
-            progressive_pass_incomplete["endY"],
-            lw=linewidth,
-            transparent=True,
-            comet=True,
-            label="incomplete progressive passes",
+    categories = pass_category_codes(passes)
+    outcomes = passes["outcomeType"].values
+    for outcome, zorder, alpha in [(1, 3, None), (0, 2, 0.6)]:
+        drawn = (outcomes == outcome) & (categories >= 0)
+        if not drawn.any():
+            continue
+        _comet_lines(
+            ax,
+            pitch,
+            passes["x"].values[drawn],
+            passes["y"].values[drawn],
+            passes["endX"].values[drawn],
+            passes["endY"].values[drawn],
+            np.array(PASS_LINE_COLORS[outcome])[categories[drawn]],
+            linewidth,
+            alpha=alpha,
             capstyle="round",
-            color="blue",
-            ax=ax,
-            alpha=0.6,
-        )
-    if cutbacks_complete.shape[0] > 0:
-        pitch.lines(
-            cutbacks_complete["x"],
-            cutbacks_complete["y"],
-            cutbacks_complete["endX"],
-            cutbacks_complete["endY"],
-            lw=linewidth,
-            transparent=True,
-            comet=True,
-            label="completed cutbacks",
-            capstyle="round",
-            color="lightgreen",
-            ax=ax,
-            zorder=3,
-        )
-    if cutbacks_incomplete.shape[0] > 0:
-        pitch.lines(
-            cutbacks_incomplete["x"],
-            cutbacks_incomplete["y"],
-            cutbacks_incomplete["endX"],
-            cutbacks_incomplete["endY"],
-            lw=linewidth,
-            transparent=True,
-            comet=True,
-            label="incomplete progressive passes",
-            capstyle="round",
-            color="green",
-            ax=ax,
-            alpha=0.6,
+            zorder=zorder,
         )
 
 
@@ -248,6 +248,7 @@ def draw_pass_legend_on_axes(
     )
 
 
+@instrumented()
 def draw_defensive_events_on_axes(
     ax: plt.Axes,
     data: pd.DataFrame,
@@ -255,11 +256,65 @@ def draw_defensive_events_on_axes(
     base_size: float,
     base_color: str,
     base_edge_color: str,
+    combine_markers: bool = False,
 ):
-    """Draw defensive events on the axes"""
-    for event_type in defensive_events:
-        apply_event_plot(
-            pitch, ax, data, event_type, base_size, base_color, base_edge_color
+    """Draw defensive events on the axes.
+
+    With `combine_markers` all events sharing a marker shape are drawn as a single
+    collection with per-point colours and sizes, instead of one per event definition.
+    """
+    # partition the rows by event definition once instead of filtering per definition
+    codes = defensive_event_codes(data)
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(len(defensive_events) + 1))
+    x = data["x"].values[order]
+    y = data["y"].values[order]
+    if combine_markers:
+        _scatter_events_by_marker(
+            pitch, ax, x, y, bounds, base_size, base_color, base_edge_color
+        )
+        return
+    for i, event_definition in enumerate(defensive_events):
+        rows = slice(bounds[i], bounds[i + 1])
+        _scatter_event(
+            pitch,
+            ax,
+            x[rows],
+            y[rows],
+            event_definition,
+            base_size,
+            base_color,
+            base_edge_color,
+        )
+
+
+def _scatter_events_by_marker(
+    pitch: Pitch, ax, x, y, bounds, base_size, base_color, base_edge_color
+):
+    # per definition style, looked up per point by repeating over each slice
+    counts = np.diff(bounds)
+    colors = to_rgba_array([e.color or base_color for e in defensive_events])
+    edge_colors = to_rgba_array(
+        [e.edge_color or base_edge_color for e in defensive_events]
+    )
+    sizes = np.array([base_size * e.size_mult for e in defensive_events])
+    markers = np.array([e.marker for e in defensive_events])
+    for marker in dict.fromkeys(markers):
+        definitions = np.flatnonzero(markers == marker)
+        rows = np.concatenate(
+            [np.arange(bounds[i], bounds[i + 1]) for i in definitions]
+        )
+        pitch.scatter(
+            x[rows],
+            y[rows],
+            marker=marker,
+            color=np.repeat(colors[definitions], counts[definitions], axis=0),
+            edgecolors=np.repeat(edge_colors[definitions], counts[definitions], axis=0),
+            ax=ax,
+            s=np.repeat(sizes[definitions], counts[definitions]),
+            alpha=0.7,
+            linewidth=1,
+            zorder=10,
         )
 
 
@@ -272,7 +327,7 @@ def draw_defensive_event_legend(
     split=1,
     loc="upper center",
     facecolor="white",
-    **kwargs
+    **kwargs,
 ):
     """Draw the defensive event legend"""
 
@@ -327,24 +382,29 @@ def draw_defensive_event_legend(
     return ax
 
 
+@instrumented()
 def draw_convex_hull_without_outliers_on_axes(
     ax: plt.Axes,
     data: pd.DataFrame,
     pitch: Pitch,
     outlier_ratio: float = 0.1,
     color: str = "cornflowerblue",
+    outlier_strategy: Union[str, OutlierStrategy] = "mahalanobis",
 ):
-    """Draw the convex hull without outliers on the axes"""
-    model = IsolationForest(contamination=outlier_ratio, random_state=0)
+    """Draw the convex hull without outliers on the axes.
+
+    `outlier_strategy` is a name from `OUTLIER_STRATEGIES`, e.g. "isolation_forest"
+    for the original behaviour, or a callable with the same signature.
+    """
     total_touches = get_touch_events(data)
     if total_touches.shape[0] <= 4:
         return None
-    total_touches["include"] = model.fit_predict(total_touches[["x", "y"]])
-    included = total_touches.loc[total_touches["include"] == 1]
+    xy = total_touches[["x", "y"]].to_numpy(dtype=float)
+    included = xy[get_outlier_strategy(outlier_strategy)(xy, outlier_ratio)]
     if included.shape[0] >= 4:
         hull = pitch.convexhull(
-            included["x"],
-            included["y"],
+            included[:, 0],
+            included[:, 1],
         )
         poly = pitch.polygon(
             hull, ax=ax, edgecolor=color, facecolor=color, alpha=0.3, zorder=3
@@ -377,15 +437,19 @@ def get_locations_by_starting_formation(data, label_column):
     return py_position
 
 
-def plot_average_position_on_pitch_by_player_for_starters(
-    ax, pitch, data, min_size=15, max_size=40, max_count=120
+def draw_average_positions(
+    ax,
+    pitch,
+    by_player,
+    label_column,
+    colours,
+    min_size=15,
+    max_size=40,
+    max_count=120,
 ):
-    label_column = "shirt_number"
-    team = data["team"].iloc[0]
-    league = data["competition"].iloc[0]
-    by_player = get_starter_locations(data, label_column)
+    """Scatter `by_player` (`x`, `y`, `count`) labelled with `label_column`"""
+    by_player = by_player.copy()
     by_player["s"] = min_size + by_player["count"] / max_count * (max_size - min_size)
-    colours = team_colours(team, league)
     pitch.scatter(
         by_player["x"],
         by_player["y"],
@@ -406,35 +470,90 @@ def plot_average_position_on_pitch_by_player_for_starters(
         )
 
 
+@instrumented()
+def plot_average_position_on_pitch_by_player_for_starters(
+    ax, pitch, data, min_size=15, max_size=40, max_count=120
+):
+    label_column = "shirt_number"
+    team = data["team"].iloc[0]
+    league = data["competition"].iloc[0]
+    draw_average_positions(
+        ax,
+        pitch,
+        get_starter_locations(data, label_column),
+        label_column,
+        team_colours(team, league),
+        min_size,
+        max_size,
+        max_count,
+    )
+
+
+@instrumented()
 def plot_average_position_on_pitch_by_position_for_starting_formation(
     ax, pitch, data, min_size=15, max_size=40, max_count=120
 ):
     label_column = "position"
     team = data["team"].iloc[0]
     league = data["competition"].iloc[0]
-    by_player = get_locations_by_starting_formation(data, label_column)
-    by_player["s"] = min_size + by_player["count"] / max_count * (max_size - min_size)
-    colours = team_colours(team, league)
-    pitch.scatter(
-        by_player["x"],
-        by_player["y"],
-        s=by_player["s"] ** 2,
-        ax=ax,
-        zorder=4,
-        c=colours[0],
+    draw_average_positions(
+        ax,
+        pitch,
+        get_locations_by_starting_formation(data, label_column),
+        label_column,
+        team_colours(team, league),
+        min_size,
+        max_size,
+        max_count,
     )
-    for i, row in by_player.iterrows():
-        pitch.annotate(
-            row[label_column],
-            xy=(row.x, row.y),
-            va="center",
-            ha="center",
-            zorder=5,
-            ax=ax,
-            c=colours[1],
+
+
+def _pass_pairs(player_passes, passer_column, receiver_column, min_combinations):
+    """Completed passes between each unordered pair of passer/receiver values.
+
+    Values are factorized in sorted order so a pair is just the min and max of its
+    two codes, giving one integer key per pass without any row-wise Python.
+    """
+    passer = player_passes[passer_column].to_numpy()
+    receiver = player_passes[receiver_column].to_numpy()
+    codes, uniques = pd.factorize(np.concatenate([passer, receiver]), sort=True)
+    passer_codes, receiver_codes = codes[: len(passer)], codes[len(passer) :]
+    low = np.minimum(passer_codes, receiver_codes)
+    high = np.maximum(passer_codes, receiver_codes)
+    progressive_bit = 1 << (PassType.PROGRESSIVE.value - 1)
+    pass_groupings = (
+        pd.DataFrame(
+            {
+                "pair": low * len(uniques) + high,
+                "x": player_passes["x"].to_numpy(),
+                "player": passer,
+                "receiver": receiver,
+                "progressive": (
+                    player_passes["passtypes"].fillna(0).to_numpy(dtype=np.int64)
+                    & progressive_bit
+                )
+                > 0,
+            }
         )
+        .groupby("pair")
+        .agg(
+            count=("x", "count"),
+            player=("player", "first"),
+            receiver=("receiver", "first"),
+            progressive_count=("progressive", "sum"),
+        )
+    )
+    uniques = np.asarray(uniques, dtype=object)
+    pair_low, pair_high = np.divmod(pass_groupings.index.to_numpy(), len(uniques))
+    pass_groupings.index = pd.Index(
+        uniques[pair_low] + "_" + uniques[pair_high], name="pair"
+    )
+    # code order differs from label order when one value is a prefix of another
+    pass_groupings = pass_groupings.sort_index()
+    return pass_groupings.loc[pass_groupings["count"] >= min_combinations]
 
 
+@instrumented()
 def get_starter_pass_network_by_name(data, min_combinations):
     subs = data.loc[data["event_type"] == EventType.SubstitutionOn, "player_name"]
 
@@ -444,94 +563,53 @@ def get_starter_pass_network_by_name(data, min_combinations):
         & (~data["player_name"].isin(subs))
         & (~data["pass_receiver"].isin(subs))
         & (data["pass_receiver"].notnull())
-    ].copy()
-    player_passes["pair"] = player_passes.apply(
-        lambda r: "_".join(
-            sorted([r["player_name"], r["pass_receiver"] if r["pass_receiver"] else ""])
-        ),
-        axis=1,
-    )
-
-    player_passes["progressive_pass"] = player_passes["passtypes"].apply(
-        lambda x: x & (1 << (PassType.PROGRESSIVE.value - 1)) > 0
-    )
-    pass_groupings = player_passes.groupby("pair").agg(
-        {
-            "x": "count",
-            "player_name": "first",
-            "pass_receiver": "first",
-            "progressive_pass": "sum",
-        }
-    )
-    pass_groupings = pass_groupings[pass_groupings["pass_receiver"].notnull()]
-    pass_groupings.columns = ["count", "player", "receiver", "progressive_count"]
-    pass_groupings = pass_groupings.loc[pass_groupings["count"] >= min_combinations]
-    return pass_groupings
+    ]
+    return _pass_pairs(player_passes, "player_name", "pass_receiver", min_combinations)
 
 
+@instrumented()
 def get_starter_pass_network_by_position(data, min_combinations):
-    subs = data.loc[data["event_type"] == EventType.SubstitutionOn, "player_name"]
-
     player_passes = data.loc[
         (data["event_type"] == EventType.Pass)
         & (data["outcomeType"] == 1)
         & (data["formation"] == data["formation"].iloc[0])
         & (data["pass_receiver_position"].notnull())
         & (data["position"].notnull())
-    ].copy()
-    player_passes["pair"] = player_passes.apply(
-        lambda r: "_".join(
-            sorted(
-                [
-                    r["position"],
-                    r["pass_receiver_position"] if r["pass_receiver_position"] else "",
-                ]
-            )
-        ),
-        axis=1,
-    )
-
-    player_passes["progressive_pass"] = player_passes["passtypes"].apply(
-        lambda x: x & (1 << (PassType.PROGRESSIVE.value - 1)) > 0
-    )
-    pass_groupings = player_passes.groupby("pair").agg(
-        {
-            "x": "count",
-            "position": "first",
-            "pass_receiver_position": "first",
-            "progressive_pass": "sum",
-        }
+    ]
+    return _pass_pairs(
+        player_passes, "position", "pass_receiver_position", min_combinations
     )
-    pass_groupings = pass_groupings[pass_groupings["pass_receiver_position"].notnull()]
-    pass_groupings.columns = ["count", "player", "receiver", "progressive_count"]
-    pass_groupings = pass_groupings.loc[pass_groupings["count"] >= min_combinations]
-    return pass_groupings
 
 
-def plot_pass_network_on_pitch_by_player_for_starters(
+def draw_pass_network(
     ax,
     pitch,
-    data,
+    pass_groupings,
+    average_positions,
+    key_column,
     max_combinations=20,
     min_width=1,
     max_width=20,
     min_transparency=0.3,
     min_combinations=3,
 ):
-    pass_groupings = get_starter_pass_network_by_name(data, min_combinations)
-    average_positions = get_starter_locations(data, "shirt_number")
+    """Draw `pass_groupings` between the `average_positions` of their player/receiver.
+
+    `average_positions` needs `key_column`, matching the groupings' player and
+    receiver values, and `x`/`y`.
+    """
     pass_groupings = pd.merge(
         pass_groupings,
-        average_positions[["player_name", "x", "y"]],
+        average_positions[[key_column, "x", "y"]],
         left_on="player",
-        right_on="player_name",
+        right_on=key_column,
         how="left",
     ).rename(columns={"x": "start_x", "y": "start_y"})
     pass_groupings = pd.merge(
         pass_groupings,
-        average_positions[["player_name", "x", "y"]],
+        average_positions[[key_column, "x", "y"]],
         left_on="receiver",
-        right_on="player_name",
+        right_on=key_column,
         how="left",
     ).rename(columns={"x": "end_x", "y": "end_y"})
 
@@ -575,7 +653,8 @@ def plot_pass_network_on_pitch_by_player_for_starters(
     return pass_groupings
 
 
-def plot_pass_network_on_pitch_by_position_for_starting_formation(
+@instrumented()
+def plot_pass_network_on_pitch_by_player_for_starters(
     ax,
     pitch,
     data,
@@ -585,63 +664,46 @@ def plot_pass_network_on_pitch_by_position_for_starting_formation(
     min_transparency=0.3,
     min_combinations=3,
 ):
-    pass_groupings = get_starter_pass_network_by_position(data, min_combinations)
-    average_positions = get_locations_by_starting_formation(data, "position")
-    pass_groupings = pd.merge(
-        pass_groupings,
-        average_positions[["position", "x", "y"]],
-        left_on="player",
-        right_on="position",
-        how="left",
-    ).rename(columns={"x": "start_x", "y": "start_y"})
-    pass_groupings = pd.merge(
-        pass_groupings,
-        average_positions[["position", "x", "y"]],
-        left_on="receiver",
-        right_on="position",
-        how="left",
-    ).rename(columns={"x": "end_x", "y": "end_y"})
+    return draw_pass_network(
+        ax,
+        pitch,
+        get_starter_pass_network_by_name(data, min_combinations),
+        get_starter_locations(data, "shirt_number"),
+        "player_name",
+        max_combinations,
+        min_width,
+        max_width,
+        min_transparency,
+        min_combinations,
+    )
 
-    total_max = max(pass_groupings["count"].max(), max_combinations)
-    pass_groupings["width"] = min_width + (
-        pass_groupings["count"] - min_combinations
-    ) / total_max * (max_width - min_width)
-    pass_groupings["pp_width"] = min_width + (
-        pass_groupings["progressive_count"] - min_combinations
-    ) / total_max * (max_width - min_width)
 
-    pass_groupings_pp = pass_groupings.loc[
-        pass_groupings["progressive_count"] > min_combinations
-    ]
-    color = np.array(to_rgba("white"))
-    color = np.tile(color, (len(pass_groupings), 1))
-    c_transparency = min_transparency + (
-        pass_groupings["count"] - min_combinations
-    ) / total_max * (1 - min_transparency)
-    color[:, 3] = c_transparency
-    pitch.lines(
-        pass_groupings["start_x"],
-        pass_groupings["start_y"],
-        pass_groupings["end_x"],
-        pass_groupings["end_y"],
-        ax=ax,
-        color=color,
-        lw=pass_groupings["width"],
-        zorder=2,
-    )
-    pitch.lines(
-        pass_groupings_pp["start_x"],
-        pass_groupings_pp["start_y"],
-        pass_groupings_pp["end_x"],
-        pass_groupings_pp["end_y"],
-        ax=ax,
-        color="red",
-        lw=pass_groupings_pp["pp_width"],
-        zorder=3,
+@instrumented()
+def plot_pass_network_on_pitch_by_position_for_starting_formation(
+    ax,
+    pitch,
+    data,
+    max_combinations=20,
+    min_width=1,
+    max_width=20,
+    min_transparency=0.3,
+    min_combinations=3,
+):
+    return draw_pass_network(
+        ax,
+        pitch,
+        get_starter_pass_network_by_position(data, min_combinations),
+        get_locations_by_starting_formation(data, "position"),
+        "position",
+        max_combinations,
+        min_width,
+        max_width,
+        min_transparency,
+        min_combinations,
     )
-    return pass_groupings
 
 
+@instrumented()
 def plot_positional_heatmap_on_pitch(
     ax,
     pitch,
@@ -651,7 +713,7 @@ def plot_positional_heatmap_on_pitch(
     cmap="hot",
 ):
     passes_mask = (data["event_type"] == EventType.Pass) & (
-        ~wf.col_has_qualifier(data, qualifier_code=107)
+        ~has_qualifier(data, qualifier_code=107)
     )
 
     path_eff = [
@@ -0,0 +1,32 @@
+import pandas as pd
+
+
+def possession_durations(dataframe: pd.DataFrame, by: str = "matchId") -> pd.DataFrame:
+    """Seconds of possession per team, from the first to the last event of each possession.
+
+    A possession is credited to the team of its first event.  Works on any number of
+    matches at once, returning one row per `by` value and team with `seconds` and
+    `pct` (share of that match's possession time, 0-100).  With `by=None` the whole
+    frame is treated as one match.
+    """
+    keys = [by] if by in dataframe.columns else []
+    possessions = dataframe.groupby(
+        keys + ["possession_number"], sort=False, observed=True
+    ).agg(
+        team=("team", "first"),
+        start=("match_seconds", "min"),
+        end=("match_seconds", "max"),
+    )
+    possessions["seconds"] = possessions["end"] - possessions["start"]
+    durations = (
+        possessions.reset_index()
+        .groupby(keys + ["team"], sort=False, observed=True)["seconds"]
+        .sum()
+        .reset_index()
+    )
+    if keys:
+        total = durations.groupby(by)["seconds"].transform("sum")
+    else:
+        total = durations["seconds"].sum()
+    durations["pct"] = durations["seconds"] / total * 100
+    return durations
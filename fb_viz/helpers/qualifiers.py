@@ -0,0 +1,122 @@
+import json
+from typing import Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+from footmav.utils import whoscored_funcs as WF
+
+QUALIFIER_BITS_COLUMN = "qualifier_bits"
+# bitmask of rows whose qualifiers could not be parsed, tested with the original lookup
+UNPARSED = -1
+
+# qualifiers tested in fb_viz, by whoscored code; the position in this dict is the bit
+TRACKED_QUALIFIERS: Dict[int, str] = {
+    2: "Cross",
+    5: "FreekickTaken",
+    6: "CornerTaken",
+    107: "ThrowIn",
+    123: "KeeperThrow",
+}
+_QUALIFIER_BITS = {code: i for i, code in enumerate(TRACKED_QUALIFIERS)}
+_DISPLAY_NAME_CODES = {name: code for code, name in TRACKED_QUALIFIERS.items()}
+
+
+def _qualifier_code(qualifier):
+    if isinstance(qualifier, dict):
+        qualifier_type = qualifier.get("type", qualifier)
+        if isinstance(qualifier_type, dict):
+            return qualifier_type.get("value")
+        return qualifier_type
+    return qualifier
+
+
+def _qualifier_bits(qualifiers) -> int:
+    if isinstance(qualifiers, str):
+        try:
+            qualifiers = json.loads(qualifiers)
+        except ValueError:
+            return UNPARSED
+    if not isinstance(qualifiers, (list, tuple, np.ndarray)):
+        return UNPARSED
+    bits = 0
+    for qualifier in qualifiers:
+        bit = _QUALIFIER_BITS.get(_qualifier_code(qualifier))
+        if bit is not None:
+            bits |= 1 << bit
+    return bits
+
+
+def attach_qualifier_flags(dataframe: pd.DataFrame) -> pd.DataFrame:
+    """Parse the `qualifiers` column once into an integer bitmask of the tracked qualifiers.
+
+    Modifies `dataframe` in place and returns it, so frames sliced from it afterwards
+    can use the fast path of `has_qualifier`.  Rows whose qualifiers are not a JSON
+    list are marked `UNPARSED` and tested with `WF.col_has_qualifier` instead of
+    reading as having no qualifiers.
+    """
+    if "qualifiers" not in dataframe.columns:
+        dataframe[QUALIFIER_BITS_COLUMN] = np.zeros(len(dataframe), dtype=np.int64)
+        return dataframe
+    dataframe[QUALIFIER_BITS_COLUMN] = np.fromiter(
+        (_qualifier_bits(q) for q in dataframe["qualifiers"].values),
+        dtype=np.int64,
+        count=len(dataframe),
+    )
+    return dataframe
+
+
+def _wf_has_any(dataframe: pd.DataFrame, qualifier_codes: List[int]) -> pd.Series:
+    result = pd.Series(False, index=dataframe.index)
+    for code in qualifier_codes:
+        result |= WF.col_has_qualifier(dataframe, qualifier_code=code)
+    return result
+
+
+def _test_bits(dataframe: pd.DataFrame, qualifier_codes: List[int]) -> pd.Series:
+    mask = 0
+    for code in qualifier_codes:
+        mask |= 1 << _QUALIFIER_BITS[code]
+    bits = dataframe[QUALIFIER_BITS_COLUMN].values
+    if bits.dtype.kind != "i":
+        # e.g. after concatenating with rows that were never flagged
+        bits = bits.astype(float)
+        unflagged = np.isnan(bits)
+        if unflagged.any() and "qualifiers" in dataframe.columns:
+            bits[unflagged] = [
+                _qualifier_bits(q) for q in dataframe["qualifiers"].values[unflagged]
+            ]
+        bits = np.nan_to_num(bits).astype(np.int64)
+    result = (bits & mask) != 0
+    unparsed = bits == UNPARSED
+    if unparsed.any():
+        result[unparsed] = _wf_has_any(
+            dataframe.loc[unparsed], qualifier_codes
+        ).to_numpy()
+    return pd.Series(result, index=dataframe.index)
+
+
+def has_qualifier(
+    dataframe: pd.DataFrame, qualifier_code: int = None, display_name: str = None
+) -> pd.Series:
+    """Drop-in for `WF.col_has_qualifier` that uses the bitmask column when it is present"""
+    code = qualifier_code
+    if code is None:
+        code = _DISPLAY_NAME_CODES.get(display_name)
+    if QUALIFIER_BITS_COLUMN in dataframe.columns and code in _QUALIFIER_BITS:
+        return _test_bits(dataframe, [code])
+    if qualifier_code is not None:
+        return WF.col_has_qualifier(dataframe, qualifier_code=qualifier_code)
+    return WF.col_has_qualifier(dataframe, display_name=display_name)
+
+
+def has_any_qualifier(dataframe: pd.DataFrame, qualifier_codes: Iterable[int]):
+    """True where any of `qualifier_codes` is present, as a single bit test when possible"""
+    qualifier_codes = list(qualifier_codes)
+    if QUALIFIER_BITS_COLUMN in dataframe.columns and all(
+        code in _QUALIFIER_BITS for code in qualifier_codes
+    ):
+        return _test_bits(dataframe, qualifier_codes)
+    result = pd.Series(False, index=dataframe.index)
+    for code in qualifier_codes:
+        result |= has_qualifier(dataframe, qualifier_code=code)
+    return result
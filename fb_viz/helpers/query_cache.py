@@ -0,0 +1,226 @@
+import hashlib
+import json
+import os
+import pickle
+import re
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+import pandas as pd
+
+from fb_viz.helpers.cache_dirs import default_cache_dir
+
+_STRING_LITERAL = re.compile(r"('(?:[^'\\]|\\.|'')*')")
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace outside of string literals so formatting changes share a key"""
+    parts = _STRING_LITERAL.split(sql)
+    return "".join(
+        part if i % 2 else re.sub(r"\s+", " ", part) for i, part in enumerate(parts)
+    ).strip()
+
+
+class CachedConnection:
+    """Wraps a connection and keeps `query`/`wsquery` results on disk.
+
+    Results are stored as Parquet when pyarrow is available and the frame can be
+    represented (falling back to pickle, e.g. for enum-typed `event_type` columns),
+    keyed by the normalized SQL.  Entries expire after `ttl` seconds unless they
+    were stored as immutable, and the least recently used entries are evicted once
+    the cache grows past `max_bytes`.  Metadata lives next to each entry so several
+    processes can share one cache directory.
+    """
+
+    def __init__(
+        self,
+        connection,
+        cache_dir: str = None,
+        ttl: Optional[float] = 24 * 60 * 60,
+        max_bytes: int = 2 * 1024**3,
+        immutable: bool = False,
+    ):
+        self._connection = connection
+        self.cache_dir = cache_dir or default_cache_dir("queries")
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.immutable = immutable
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def __getattr__(self, name):
+        if name == "_connection":
+            raise AttributeError(name)
+        return getattr(self._connection, name)
+
+    def query(self, sql: str, ttl: float = None, immutable: bool = None):
+        return self._cached("query", sql, ttl, immutable)
+
+    def wsquery(self, sql: str, ttl: float = None, immutable: bool = None):
+        return self._cached("wsquery", sql, ttl, immutable)
+
+    @contextmanager
+    def immutable_results(self):
+        """Store every result fetched inside the block as immutable (e.g. finished matches)"""
+        previous = self.immutable
+        self.immutable = True
+        try:
+            yield self
+        finally:
+            self.immutable = previous
+
+    def invalidate(self, sql: str = None, method: str = "query"):
+        """Drop one cached statement, or the whole cache when `sql` is None"""
+        if sql is not None:
+            self._remove(self._key(method, sql))
+            return
+        for meta_path in self._meta_paths():
+            self._remove(os.path.basename(meta_path)[: -len(".json")])
+
+    def size_bytes(self) -> int:
+        return sum(meta["bytes"] for _, meta in self._entries())
+
+    def _key(self, method: str, sql: str) -> str:
+        return hashlib.sha256(
+            f"{method}\n{normalize_sql(sql)}".encode("utf-8")
+        ).hexdigest()
+
+    def _meta_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _data_path(self, key: str, fmt: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.{fmt}")
+
+    def _meta_paths(self):
+        return [
+            os.path.join(self.cache_dir, f)
+            for f in os.listdir(self.cache_dir)
+            if f.endswith(".json")
+        ]
+
+    def _entries(self):
+        for meta_path in self._meta_paths():
+            try:
+                with open(meta_path) as fp:
+                    yield meta_path, json.load(fp)
+            except (OSError, ValueError):
+                continue
+
+    def _cached(self, method: str, sql: str, ttl: float, immutable: bool):
+        key = self._key(method, sql)
+        data = self._load(key)
+        if data is not None:
+            self.hits += 1
+            return data
+        self.misses += 1
+        data = getattr(self._connection, method)(sql)
+        self._store(
+            key,
+            method,
+            sql,
+            data,
+            self.ttl if ttl is None else ttl,
+            self.immutable if immutable is None else immutable,
+        )
+        return data
+
+    def _load(self, key: str) -> Optional[pd.DataFrame]:
+        try:
+            with open(self._meta_path(key)) as fp:
+                meta = json.load(fp)
+        except (OSError, ValueError):
+            return None
+        expired = (
+            not meta["immutable"]
+            and meta["ttl"] is not None
+            and time.time() - meta["created"] > meta["ttl"]
+        )
+        data_path = self._data_path(key, meta["format"])
+        if expired or not os.path.exists(data_path):
+            self._remove(key)
+            return None
+        try:
+            if meta["format"] == "parquet":
+                data = pd.read_parquet(data_path)
+            else:
+                with open(data_path, "rb") as fp:
+                    data = pickle.load(fp)
+        except Exception:
+            self._remove(key)
+            return None
+        os.utime(data_path)
+        return data
+
+    def _store(self, key, method, sql, data, ttl, immutable):
+        if not isinstance(data, pd.DataFrame):
+            return
+        fmt = "parquet"
+        tmp_path = self._data_path(key, f"{os.getpid()}.tmp")
+        try:
+            data.to_parquet(tmp_path)
+        except Exception:
+            fmt = "pkl"
+            with open(tmp_path, "wb") as fp:
+                pickle.dump(data, fp, protocol=pickle.HIGHEST_PROTOCOL)
+        data_path = self._data_path(key, fmt)
+        os.replace(tmp_path, data_path)
+        meta = dict(
+            method=method,
+            sql=normalize_sql(sql),
+            created=time.time(),
+            ttl=ttl,
+            immutable=immutable,
+            format=fmt,
+            bytes=os.path.getsize(data_path),
+        )
+        tmp_meta_path = f"{self._meta_path(key)}.{os.getpid()}.tmp"
+        with open(tmp_meta_path, "w") as fp:
+            json.dump(meta, fp)
+        os.replace(tmp_meta_path, self._meta_path(key))
+        self._evict()
+
+    def _remove(self, key: str):
+        for fmt in ["json", "parquet", "pkl"]:
+            try:
+                os.remove(os.path.join(self.cache_dir, f"{key}.{fmt}"))
+            except OSError:
+                pass
+
+    def _evict(self):
+        entries = []
+        for meta_path, meta in self._entries():
+            key = os.path.basename(meta_path)[: -len(".json")]
+            try:
+                last_used = os.path.getmtime(self._data_path(key, meta["format"]))
+            except OSError:
+                last_used = 0
+            entries.append((last_used, key, meta["bytes"]))
+        total = sum(e[2] for e in entries)
+        for _, key, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(key)
+            total -= size
+
+
+class SqliteConnection:
+    """Minimal stand-in for the MySQL connection backed by a local SQLite file"""
+
+    def __init__(self, path: str = ":memory:"):
+        self._conn = sqlite3.connect(path)
+
+    def query(self, sql: str) -> pd.DataFrame:
+        return pd.read_sql_query(sql, self._conn)
+
+    def wsquery(self, sql: str) -> pd.DataFrame:
+        return self.query(sql)
+
+    def execute(self, sql: str):
+        self._conn.execute(sql)
+        self._conn.commit()
+
+    def load_table(self, name: str, dataframe: pd.DataFrame):
+        dataframe.to_sql(name, self._conn, if_exists="replace", index=False)
@@ -1,7 +1,16 @@
-from typing import Dict, List
-import requests
 import json
-from urllib.error import HTTPError
+import os
+import threading
+import time
+from typing import Callable, Dict, Hashable, List, Optional
+from urllib.parse import quote
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from fb_viz.helpers.cache_dirs import default_cache_dir
+
+COLOURS_URL = "http://www.mclachbot.com:9000/colours"
 
 
 DEFINED_TEAM_COLOURS = {
@@ -59,6 +68,170 @@ DEFINED_TEAM_COLOURS = {
 }
 
 
+class TeamColourService:
+    """Team colour lookups against the mclachbot colours api.
+
+    Colours are memoized in process and persisted to a JSON file on disk.  The first
+    lookup for a league asks for every team in that league in a single request, so
+    a whole matchday resolves with one round trip; teams missing from the bulk
+    response fall back to the per team endpoint.  Requests run outside the lock, so
+    a slow team doesn't hold up lookups for the others.
+    """
+
+    def __init__(
+        self,
+        base_url: str = COLOURS_URL,
+        cache_path: str = None,
+        ttl: float = 7 * 24 * 60 * 60,
+        timeout: float = 10,
+        pool_size: int = 8,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.cache_path = cache_path or os.path.join(
+            default_cache_dir("colours"), "team_colours.json"
+        )
+        self.ttl = ttl
+        self.timeout = timeout
+        self.requests = 0
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._lock = threading.Lock()
+        # {league: {"loaded": timestamp or None, "teams": {team: [colour, colour]}}}
+        self._leagues = self._read_disk()
+        # (league, team) pairs the api had no colours for, only kept in process
+        self._unknown = set()
+        self._bulk_unavailable = set()
+        # keys of the league or team fetches running now, see `_single_flight`
+        self._in_flight: Dict[Hashable, threading.Event] = {}
+
+    def get(self, team: str, league: str) -> Optional[List[str]]:
+        """Colours for `team`, or None if the api has none"""
+        with self._lock:
+            entry = self._leagues.get(league)
+            load_league = (
+                entry is None or not self._is_fresh(entry)
+            ) and league not in self._bulk_unavailable
+        if load_league:
+            self._single_flight(league, lambda: self._load_league(league))
+        with self._lock:
+            colours = self._cached(team, league)
+            if colours is not None or (league, team) in self._unknown:
+                return colours
+        self._single_flight((league, team), lambda: self._load_team(team, league))
+        with self._lock:
+            return self._cached(team, league)
+
+    def load_league(self, league: str) -> Dict[str, List[str]]:
+        """Fetch and cache the colours of every team in `league`"""
+        with self._lock:
+            self._bulk_unavailable.discard(league)
+        self._single_flight(league, lambda: self._load_league(league))
+        with self._lock:
+            return dict(self._leagues.get(league, {"teams": {}})["teams"])
+
+    def clear(self):
+        with self._lock:
+            self._leagues = {}
+            self._unknown.clear()
+            self._bulk_unavailable.clear()
+            try:
+                os.remove(self.cache_path)
+            except OSError:
+                pass
+
+    def _is_fresh(self, entry: Dict) -> bool:
+        return entry["loaded"] is not None and time.time() - entry["loaded"] < self.ttl
+
+    def _cached(self, team: str, league: str) -> Optional[List[str]]:
+        return self._leagues.get(league, {"teams": {}})["teams"].get(team)
+
+    def _single_flight(self, key, fetch: Callable[[], None]):
+        """Run `fetch` without holding the lock, once per key at a time; callers that
+        find the same key already being fetched wait for that fetch instead"""
+        with self._lock:
+            event = self._in_flight.get(key)
+            owner = event is None
+            if owner:
+                event = self._in_flight[key] = threading.Event()
+        if not owner:
+            event.wait()
+            return
+        try:
+            fetch()
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            event.set()
+
+    def _get_json(self, url: str):
+        with self._lock:
+            self.requests += 1
+        try:
+            r = self.session.get(url, timeout=self.timeout)
+        except requests.RequestException:
+            return None
+        if r.status_code != 200:
+            return None
+        try:
+            return json.loads(r.text)
+        except ValueError:
+            return None
+
+    def _load_league(self, league: str):
+        colours = self._get_json(f"{self.base_url}/{quote(league)}")
+        with self._lock:
+            if not isinstance(colours, dict):
+                self._bulk_unavailable.add(league)
+                return
+            teams = {
+                team: list(team_colours)
+                for team, team_colours in colours.items()
+                if self._valid(team_colours)
+            }
+            entry = self._leagues.setdefault(league, {"loaded": None, "teams": {}})
+            entry["teams"].update(teams)
+            entry["loaded"] = time.time()
+            self._write_disk()
+
+    def _load_team(self, team: str, league: str):
+        colours = self._get_json(f"{self.base_url}/{quote(league)}/{quote(team)}")
+        with self._lock:
+            if not self._valid(colours):
+                self._unknown.add((league, team))
+                return
+            entry = self._leagues.setdefault(league, {"loaded": None, "teams": {}})
+            entry["teams"][team] = list(colours)
+            self._write_disk()
+
+    @staticmethod
+    def _valid(colours) -> bool:
+        return (
+            isinstance(colours, (list, tuple))
+            and len(colours) > 0
+            and bool(colours[0])
+            and colours[0] != "None"
+        )
+
+    def _read_disk(self) -> Dict:
+        try:
+            with open(self.cache_path) as fp:
+                return json.load(fp)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_disk(self):
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        tmp_path = f"{self.cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as fp:
+            json.dump(self._leagues, fp)
+        os.replace(tmp_path, self.cache_path)
+
+
+colour_service = TeamColourService()
+
+
 def team_colours(
     team: str,
     league: str,
@@ -69,18 +242,4 @@ def team_colours(
     existing_map = existing_map or DEFINED_TEAM_COLOURS
     if team in existing_map:
         return existing_map[team]
-    league = league.replace(" ", "%20")
-    team = team.replace(" ", "%20")
-    url = f"http://www.mclachbot.com:9000/colours/{league}/{team}"
-    try:
-        r = requests.get(url)
-        if r.status_code == 200:
-            colours = json.loads(r.text)
-            if not colours[0] or colours[0] == "None":
-                return default_colours
-            return colours
-        else:
-            return default_colours
-
-    except HTTPError:
-        return None
+    return colour_service.get(team, league) or default_colours
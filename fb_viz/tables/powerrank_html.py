@@ -0,0 +1,276 @@
+import html
+from typing import Dict, List
+
+import matplotlib
+import numpy as np
+import pandas as pd
+
+from fb_viz.helpers.dataframe_style_helpers import colormap_lut
+from fb_viz.tables.powerranking import PowerRank
+
+
+class PowerRankHtml:
+    """HTML for `PowerRank.create_rank` tables, styled like `PowerRank.format` but with
+    a fixed set of CSS classes instead of inline styles on every cell.
+
+    Colour buckets for the whole table are computed up front, so any page of it can
+    be rendered on its own::
+
+        renderer = PowerRankHtml(num_games=5, heatmap_style="relative")
+        page = renderer.render(ranked, top_n=100)
+        pages = renderer.pages(ranked, page_size=250)
+
+    Heatmaps are quantized to `gradient_steps` colours of `cmap`.
+    """
+
+    RANK_BUCKETS = [10, 25, 50, 75, 95, 99]
+    RANK_COLOURS = ["grey", "white", "green", "blue", "purple", "orange", "pink"]
+    HEATMAP_RANGES = {
+        "total": PowerRank.TOTAL_RANGE,
+        "providing": PowerRank.PROVIDING_RANGE,
+        "progressing": PowerRank.PROGRESSING_RANGE,
+        "finishing": PowerRank.FINISHING_RANGE,
+        "defending": PowerRank.DEFENDING_RANGE,
+        "keeping": PowerRank.KEEPING_RANGE,
+    }
+    OUTFIELD_METRICS = ["providing", "progressing", "finishing", "defending"]
+    HIDDEN_COLUMNS = [
+        "PCT Rank (Team)",
+        "is_keeper",
+        "finishing_r",
+        "defending_r",
+        "progressing_r",
+        "providing_r",
+        "keeping_r",
+        "total_r",
+        "Rank (Overall)",
+    ]
+
+    def __init__(
+        self,
+        num_games: int,
+        heatmap_style: str = "relative",
+        cmap: str = "RdYlGn",
+        gradient_steps: int = 64,
+        table_id: str = "powerrank",
+        text_luminance_threshold: float = 0.408,
+    ):
+        assert heatmap_style in [
+            "absolute",
+            "relative",
+        ], 'heatmap_style must be either "absolute" or "relative"'
+        self.num_games = num_games
+        self.heatmap_style = heatmap_style
+        self.cmap = cmap
+        self.gradient_steps = gradient_steps
+        self.table_id = table_id
+        self.text_luminance_threshold = text_luminance_threshold
+
+    def css(self) -> str:
+        t = f"#{self.table_id}"
+        rules = [
+            f"{t} td {{background-color: #000011; color: ivory; "
+            "border: 1px black solid !important}",
+            f"{t} th {{background-color: #000022; color: ivory; font-weight: bold; "
+            "border-bottom: 1px solid ivory}",
+            f"{t} caption {{color: ivory; font-weight: bold; font-size: 150%; "
+            "background-color: #000022}",
+        ]
+        for i, colour in enumerate(self.RANK_COLOURS):
+            rules.append(f"{t} td.r{i} {{color: {colour}; font-weight: bold}}")
+        for i, (background, text) in enumerate(self._gradient_colours()):
+            rules.append(
+                f"{t} td.h{i} {{background-color: {background}; color: {text}}}"
+            )
+        for i, (background, text) in enumerate(PowerRank.LEAGUE_COLOURS.values()):
+            rules.append(
+                f"{t} td.l{i} {{background-color: {background}; color: {text}}}"
+            )
+        for name, colour in [
+            ("up", "lightgreen"),
+            ("down", "lightcoral"),
+            ("same", "grey"),
+        ]:
+            rules.append(
+                f"{t} td.{name} {{color: {colour}; text-align: center; font-size: 150%}}"
+            )
+        # last, so blanked out cells win over their heatmap colour
+        rules.append(f"{t} td.x {{color: #000011; background-color: #000011}}")
+        return "\n".join(rules)
+
+    def _lut_indices(self, n_colours: int) -> np.ndarray:
+        """Colormap entry of each gradient step, the first of those the step covers"""
+        return np.arange(self.gradient_steps) * n_colours // self.gradient_steps
+
+    def _gradient_colours(self) -> List[tuple]:
+        if self.heatmap_style == "relative":
+            # as background_gradient_from_another_column picks colours and text
+            hex_colours, luminance = colormap_lut(self.cmap)
+            idx = self._lut_indices(len(hex_colours) - 1)
+            colours, luminance = hex_colours[idx], luminance[idx]
+        else:
+            # as pandas' background_gradient, on linearized sRGB
+            colormap = matplotlib.colormaps[self.cmap]
+            rgba = colormap(self._lut_indices(colormap.N))
+            linear = np.where(
+                rgba[:, :3] <= 0.03928,
+                rgba[:, :3] / 12.92,
+                ((rgba[:, :3] + 0.055) / 1.055) ** 2.4,
+            )
+            luminance = linear @ np.array([0.2126, 0.7152, 0.0722])
+            colours = [matplotlib.colors.rgb2hex(colour) for colour in rgba]
+        return [
+            (colour, "black" if lum > self.text_luminance_threshold else "white")
+            for colour, lum in zip(colours, luminance)
+        ]
+
+    def _gradient_classes(
+        self, values: np.ndarray, vmin: float, vmax: float
+    ) -> np.ndarray:
+        normed = np.clip((values - vmin) / (vmax - vmin or 1), 0, 1)
+        # floor and clip, as Colormap.__call__ indexes its lookup table
+        steps = np.minimum(
+            (np.nan_to_num(normed) * self.gradient_steps).astype(int),
+            self.gradient_steps - 1,
+        )
+        classes = np.char.add("h", steps.astype(str)).astype(object)
+        classes[np.isnan(values)] = ""
+        return classes
+
+    def _heatmap_classes(self, dataframe: pd.DataFrame, metric: str) -> np.ndarray:
+        if self.heatmap_style == "absolute":
+            # PowerRank.format negates the lower bound, which pushes keeping's
+            # vmin above any normal value; the ranges are used as given here
+            low, high = self.HEATMAP_RANGES[metric]
+            scale = np.sqrt(self.num_games)
+            values = dataframe[metric].to_numpy(dtype=float)
+            return self._gradient_classes(values, low * scale, high * scale)
+        values = dataframe[f"{metric}_r"].to_numpy(dtype=float)
+        return self._gradient_classes(
+            values, min(0, np.nanmin(values)), max(0, np.nanmax(values))
+        )
+
+    def _rank_classes(self, values: np.ndarray) -> np.ndarray:
+        buckets = np.searchsorted(self.RANK_BUCKETS, values, side="right")
+        return np.char.add("r", buckets.astype(str)).astype(object)
+
+    def cell_classes(self, dataframe: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """CSS classes of every cell, by column"""
+        n = len(dataframe)
+        classes = {c: np.full(n, "", dtype=object) for c in dataframe.columns}
+        for metric in self.HEATMAP_RANGES:
+            if metric in dataframe.columns:
+                classes[metric] = self._heatmap_classes(dataframe, metric)
+        for c in ["Percentile Rank (Overall)", "Percentile Rank (League)"]:
+            classes[c] = self._rank_classes(dataframe[c].to_numpy(dtype=float))
+        team_pct = dataframe["PCT Rank (Team)"].to_numpy(dtype=float)
+        classes["Rank (Team)"] = np.where(
+            np.isnan(team_pct), "", self._rank_classes(team_pct)
+        ).astype(object)
+        league_codes = pd.Categorical(
+            dataframe["domestic league"], categories=list(PowerRank.LEAGUE_COLOURS)
+        ).codes
+        classes["domestic league"] = np.where(
+            league_codes >= 0, np.char.add("l", league_codes.astype(str)), ""
+        ).astype(object)
+        change = dataframe["Rank Change"].to_numpy(dtype=float)
+        classes["Rank Change"] = np.select(
+            [change > 0, change < 0, change == 0], ["up", "down", "same"], ""
+        ).astype(object)
+
+        is_keeper = dataframe["is_keeper"].to_numpy(dtype=bool)
+        for metric in self.OUTFIELD_METRICS:
+            classes[metric] = np.where(
+                is_keeper, classes[metric] + " x", classes[metric]
+            )
+        classes["keeping"] = np.where(
+            ~is_keeper, classes["keeping"] + " x", classes["keeping"]
+        )
+        return classes
+
+    @staticmethod
+    def _rank_change_text(change: np.ndarray) -> np.ndarray:
+        return np.select(
+            [
+                change >= 100,
+                change >= 50,
+                change > 0,
+                change <= -100,
+                change <= -50,
+                change < 0,
+            ],
+            ["↑↑↑", "↑↑", "↑", "↓↓↓", "↓↓", "↓"],
+            "-",
+        )
+
+    def cell_text(self, dataframe: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Escaped display text of every cell, by column"""
+        text = {}
+        for c in dataframe.columns:
+            values = dataframe[c]
+            if c == "Rank Change":
+                text[c] = self._rank_change_text(values.to_numpy(dtype=float))
+            elif c == "player":
+                text[c] = values.str.title().map(html.escape).to_numpy()
+            elif pd.api.types.is_numeric_dtype(
+                values
+            ) and not pd.api.types.is_bool_dtype(values):
+                text[c] = np.char.mod("%.0f", values.to_numpy(dtype=float))
+            else:
+                text[c] = values.astype(str).map(html.escape).to_numpy()
+        return text
+
+    def render(
+        self,
+        dataframe: pd.DataFrame,
+        top_n: int = None,
+        start: int = 0,
+        include_css: bool = True,
+    ) -> str:
+        """The table's rows from `start`, `top_n` of them or all, as an HTML table"""
+        return self._render(
+            dataframe,
+            self.cell_classes(dataframe),
+            self.cell_text(dataframe),
+            slice(start, None if top_n is None else start + top_n),
+            include_css,
+        )
+
+    def pages(self, dataframe: pd.DataFrame, page_size: int) -> List[str]:
+        """The table split into pages of `page_size` rows, sharing one colour scale"""
+        classes = self.cell_classes(dataframe)
+        text = self.cell_text(dataframe)
+        return [
+            self._render(
+                dataframe, classes, text, slice(start, start + page_size), True
+            )
+            for start in range(0, len(dataframe), page_size)
+        ]
+
+    def _render(
+        self,
+        dataframe: pd.DataFrame,
+        classes: Dict[str, np.ndarray],
+        text: Dict[str, np.ndarray],
+        rows: slice,
+        include_css: bool,
+    ) -> str:
+        columns = [c for c in dataframe.columns if c not in self.HIDDEN_COLUMNS]
+        cells = []
+        for c in columns:
+            class_attrs = np.where(
+                classes[c][rows] != "", ' class="' + classes[c][rows] + '"', ""
+            )
+            cells.append(
+                "<td" + class_attrs + ">" + text[c][rows].astype(object) + "</td>"
+            )
+        body = "\n".join("<tr>" + "".join(row) + "</tr>" for row in zip(*cells))
+        header = "".join(f"<th>{html.escape(str(c).title())}</th>" for c in columns)
+        caption = f"Top 5 League Power Rankings - Based on Last {self.num_games} Games"
+        table = (
+            f'<table id="{self.table_id}">\n<caption>{caption}</caption>\n'
+            f"<thead><tr>{header}</tr></thead>\n<tbody>\n{body}\n</tbody>\n</table>"
+        )
+        if include_css:
+            return f"<style>\n{self.css()}\n</style>\n{table}"
+        return table
@@ -0,0 +1,160 @@
+import os
+from typing import Dict, List
+
+import pandas as pd
+
+from fb_viz.helpers.cache_dirs import default_cache_dir
+from fb_viz.tables.powerranking import PowerRank
+from fb_viz.tables.rank_history import RankHistory
+
+
+class PowerRankStore:
+    """The last `n_games` + 1 games of power ranking rows, kept on disk and updated
+    with only the matches played since the previous update.
+
+    Windows are per squad, as in `PowerRank.get_data_last_n_games`, or per (player,
+    squad) with `by_player`, as in `get_data_last_n_games_player`.  The first
+    `update` fetches the season once; later ones only fetch rows from the oldest
+    of the league squads' latest stored league dates onwards, looking back at most
+    `MAX_LOOKBACK`, so ranks and rank changes can be refreshed after every
+    matchday without re-running the windowed season query.  Every update also
+    records the new ranks in a `RankHistory`, so rank changes can be taken against
+    any earlier gameweek::
+
+        store = PowerRankStore(PowerRank(conn), season=2023, n_games=5)
+        store.update()
+        table = store.create_rank("total", since="2023-09-04")
+    """
+
+    # how far before the latest stored match an update looks back at most, so one
+    # squad without recent league games can't make every update refetch the season
+    MAX_LOOKBACK = pd.Timedelta(days=28)
+
+    NEW_ROWS_QUERY = """
+        SELECT * FROM derived.fbref_power_ranking
+        WHERE season = {season} {filters}
+        """
+
+    def __init__(
+        self,
+        power_rank: PowerRank,
+        season: int,
+        n_games: int,
+        by_player: bool = False,
+        path: str = None,
+    ):
+        self.power_rank = power_rank
+        self.season = season
+        self.n_games = n_games
+        self.by_player = by_player
+        name = f"{season}_{n_games}_{'player' if by_player else 'team'}"
+        self.path = path or os.path.join(default_cache_dir("powerrank"), f"{name}.pkl")
+        self.rows = pd.read_pickle(self.path) if os.path.exists(self.path) else None
+        self.history = RankHistory(
+            name, path=f"{os.path.splitext(path)[0]}_history.pkl" if path else None
+        )
+
+    @property
+    def window_keys(self) -> List[str]:
+        return ["player", "squad"] if self.by_player else ["squad"]
+
+    def _watermarks(self) -> pd.Series:
+        """Latest stored league match date per squad still playing in one of the five
+        leagues.  Cup opponents and knocked out sides stay in the store but stop
+        playing, so they would pin the watermark to months ago."""
+        league_rows = self.rows.loc[self.rows["comp"].isin(PowerRank.LEAGUE_COLOURS)]
+        if league_rows.empty:
+            league_rows = self.rows
+        return league_rows.groupby("squad")["date"].max()
+
+    def _new_rows_query(self) -> str:
+        filters = []
+        if not self.by_player:
+            comps = ",".join(f"'{c}'" for c in PowerRank.COMPETITIONS)
+            filters.append(f"AND comp IN ({comps})")
+        if self.rows is not None and not self.rows.empty:
+            # the oldest of the league squads' watermarks, so rows for a league
+            # scraped after another league's later matches were stored still arrive
+            since = max(
+                self._watermarks().min(), self.rows["date"].max() - self.MAX_LOOKBACK
+            )
+            since = pd.Timestamp(since).strftime("%Y-%m-%d")
+            filters.append(f"AND date >= '{since}'")
+        return self.NEW_ROWS_QUERY.format(season=self.season, filters=" ".join(filters))
+
+    def _trim(self, rows: pd.DataFrame) -> pd.DataFrame:
+        """Keep the latest `n_games` + 1 matches of every window"""
+        matches = rows[self.window_keys + ["match_id", "date"]].drop_duplicates(
+            self.window_keys + ["match_id"]
+        )
+        matches = matches.sort_values("date", ascending=False, kind="mergesort")
+        matches = matches.loc[
+            matches.groupby(self.window_keys, sort=False).cumcount() <= self.n_games
+        ]
+        return rows.merge(
+            matches[self.window_keys + ["match_id"]], on=self.window_keys + ["match_id"]
+        )
+
+    def update(self) -> int:
+        """Fetch and apply new rows, returning how many were added"""
+        new_rows = self.power_rank.connection.query(self._new_rows_query())
+        known = None
+        if self.rows is not None and not self.rows.empty:
+            known = pd.MultiIndex.from_frame(self.rows[["player", "squad", "match_id"]])
+            new_rows = new_rows.loc[
+                ~pd.MultiIndex.from_frame(
+                    new_rows[["player", "squad", "match_id"]]
+                ).isin(known)
+            ]
+        if new_rows.empty and self.rows is not None:
+            return 0
+        new_rows = self.power_rank.decorate_team_names(new_rows)
+        rows = self._trim(pd.concat([self.rows, new_rows], ignore_index=True))
+        added = len(rows)
+        if known is not None:
+            # rows refetched from before their squad's window are trimmed away again
+            keys = pd.MultiIndex.from_frame(rows[["player", "squad", "match_id"]])
+            added = int((~keys.isin(known)).sum())
+            if added == 0:
+                return 0
+        self.rows = rows
+        self.save()
+        self.record_history()
+        return added
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        self.rows.to_pickle(tmp_path)
+        os.replace(tmp_path, self.path)
+
+    @property
+    def data(self) -> pd.DataFrame:
+        """The stored windows, shaped like `PowerRank.get_data_last_n_games`"""
+        if self.rows is None:
+            self.update()
+        return PowerRank.add_domestic_leagues(self.rows.copy())
+
+    @property
+    def week(self) -> pd.Timestamp:
+        """The gameweek of the latest stored match"""
+        return RankHistory.week_of(self.rows["date"].max())
+
+    def record_history(self, metrics: List[str] = None):
+        self.history.record_many(
+            self.power_rank.create_ranks(self.data, metrics, self.by_player), self.week
+        )
+
+    def create_rank(self, metric_to_use: str, since=None) -> pd.DataFrame:
+        """Ranks for the stored windows, with `Rank Change` against the previous window
+        or, given `since`, against the ranks recorded for that gameweek"""
+        if self.by_player:
+            ranked = self.power_rank.create_player_rank(self.data, metric_to_use)
+        else:
+            ranked = self.power_rank.create_rank(self.data, metric_to_use)
+        if since is not None:
+            ranked = self.history.rank_change(ranked, metric_to_use, since)
+        return ranked
+
+    def create_ranks(self, metrics: List[str] = None) -> Dict[str, pd.DataFrame]:
+        return self.power_rank.create_ranks(self.data, metrics, self.by_player)
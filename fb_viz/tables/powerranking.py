@@ -1,4 +1,4 @@
-from typing import Callable, Tuple
+from typing import Callable, Dict, List, Tuple
 from dbconnect.connector import Connection
 import pandas as pd
 import numpy as np
@@ -16,6 +16,15 @@ class PowerRank:
         "Bundesliga": ("black", "red"),
         "Serie A": ("green", "white"),
     }
+    COMPETITIONS = [
+        "Premier League",
+        "Ligue 1",
+        "La Liga",
+        "Bundesliga",
+        "Serie A",
+        "Champions League",
+        "Europa League",
+    ]
     KEEPING_RANGE = (-1500, 3300)
     DEFENDING_RANGE = (-500, 2500)
     FINISHING_RANGE = (0, 1700)
@@ -23,8 +32,8 @@ class PowerRank:
     PROVIDING_RANGE = (0, 2000)
     TOTAL_RANGE = (-1500, 7200)
 
-    def __init__(self):
-        self.connection = Connection("M0neyMa$e")
+    def __init__(self, connection=None):
+        self.connection = connection or Connection("M0neyMa$e")
 
     def team_data(self) -> pd.DataFrame:
         team_query = """
@@ -39,15 +48,7 @@ class PowerRank:
         """
         return self.connection.query(sql)
 
-    def get_data_last_n_games_player(self, n_games: int, season: int) -> pd.DataFrame:
-        sql = f"""
-            WITH match_index AS (
-                SELECT fb.*, ROW_NUMBER() OVER (PARTITION BY player,squad ORDER BY date DESC) AS rn
-                FROM derived.fbref_power_ranking AS fb WHERE SEASON={season}
-            ) SELECT * FROM match_index WHERE rn <={n_games+1};
-
-        """
-        data = self.connection.query(sql)
+    def decorate_team_names(self, data: pd.DataFrame) -> pd.DataFrame:
         team_names = self.team_data()
         data = pd.merge(
             data, team_names, how="left", left_on="squad", right_on="team_name"
@@ -55,7 +56,11 @@ class PowerRank:
         data["opponent"] = data["opponent"].map(
             team_names.set_index("team_name")["decorated_name"]
         )
+        return data
 
+    @staticmethod
+    def add_domestic_leagues(data: pd.DataFrame) -> pd.DataFrame:
+        """Add each squad's domestic league and drop squads that only have cup games"""
         domestic_leagues = (
             data.groupby("squad")
             .agg(
@@ -73,6 +78,17 @@ class PowerRank:
         data = data.loc[data["domestic league"] != ""]
         return data
 
+    def get_data_last_n_games_player(self, n_games: int, season: int) -> pd.DataFrame:
+        sql = f"""
+            WITH match_index AS (
+                SELECT fb.*, ROW_NUMBER() OVER (PARTITION BY player,squad ORDER BY date DESC) AS rn
+                FROM derived.fbref_power_ranking AS fb WHERE SEASON={season}
+            ) SELECT * FROM match_index WHERE rn <={n_games+1};
+
+        """
+        data = self.connection.query(sql)
+        return self.add_domestic_leagues(self.decorate_team_names(data))
+
     def get_data_last_n_games(self, n_games: int, season: int) -> pd.DataFrame:
         sql = f"""
 
@@ -103,70 +119,32 @@ class PowerRank:
             """
 
         data = self.connection.query(sql)
-        team_names = self.team_data()
-        data = pd.merge(
-            data, team_names, how="left", left_on="squad", right_on="team_name"
-        )
-        data["opponent"] = data["opponent"].map(
-            team_names.set_index("team_name")["decorated_name"]
-        )
+        return self.add_domestic_leagues(self.decorate_team_names(data))
 
-        domestic_leagues = (
-            data.groupby("squad")
-            .agg(
-                {
-                    "comp": lambda x: ",".join(x.unique())
-                    .replace("Champions League", "")
-                    .replace("Europa League", "")
-                    .strip(",")
-                }
-            )
-            .reset_index()
-            .rename(columns={"comp": "domestic league"})
-        )
-        data = pd.merge(left=data, right=domestic_leagues, on="squad", how="left")
-        data = data.loc[data["domestic league"] != ""]
-        return data
+    @staticmethod
+    def window_masks(
+        data: pd.DataFrame, keys: List[str]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Masks of the current window, every match but each group's earliest, and of
+        the previous window, every match but each group's latest"""
+        order = np.argsort(data["date"].to_numpy(), kind="stable")
+        grouped = data.iloc[order].groupby(keys, sort=False)["match_id"]
+        first_match = np.empty(len(data), dtype=object)
+        last_match = np.empty(len(data), dtype=object)
+        first_match[order] = grouped.transform("first").to_numpy()
+        last_match[order] = grouped.transform("last").to_numpy()
+        match_id = data["match_id"].to_numpy()
+        return match_id != first_match, match_id != last_match
 
     def _prev_for_teams(self, data) -> Tuple[pd.DataFrame, pd.DataFrame]:
-
-        first_match = (
-            data.sort_values("date", ascending=True)
-            .groupby(["squad"])
-            .apply(lambda x: x["match_id"].unique()[0])
-        )
-        last_match = (
-            data.sort_values("date", ascending=True)
-            .groupby(["squad"])
-            .apply(lambda x: x["match_id"].unique()[-1])
-        )
-        first_match.name = "first_match"
-        last_match.name = "last_match"
-        data = pd.merge(data, first_match, on="squad", how="left")
-        data = pd.merge(data, last_match, on="squad", how="left")
-        prev_data = data.loc[data["match_id"] != data["last_match"]]
-        data = data.loc[data["match_id"] != data["first_match"]]
-        return data, prev_data
+        current, previous = self.window_masks(data, ["squad"])
+        return data.loc[current], data.loc[previous]
 
     def _prev_for_players(self, data) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        current, previous = self.window_masks(data, ["squad", "player"])
+        return data.loc[current], data.loc[previous]
 
-        first_match = (
-            data.sort_values("date", ascending=True)
-            .groupby(["squad", "player"])
-            .apply(lambda x: x["match_id"].unique()[0])
-        )
-        last_match = (
-            data.sort_values("date", ascending=True)
-            .groupby(["squad", "player"])
-            .apply(lambda x: x["match_id"].unique()[-1])
-        )
-        first_match.name = "first_match"
-        last_match.name = "last_match"
-        data = pd.merge(data, first_match, on=["squad", "player"], how="left")
-        data = pd.merge(data, last_match, on=["squad", "player"], how="left")
-        prev_data = data.loc[data["match_id"] != data["last_match"]]
-        data = data.loc[data["match_id"] != data["first_match"]]
-        return data, prev_data
+    METRICS = ["defending", "finishing", "progressing", "providing", "keeping", "total"]
 
     def create_rank(self, data: pd.DataFrame, metric_to_use: str) -> pd.DataFrame:
         return self._create_rank(data, metric_to_use, self._prev_for_teams)
@@ -176,45 +154,34 @@ class PowerRank:
     ) -> pd.DataFrame:
         return self._create_rank(data, metric_to_use, self._prev_for_players)
 
-    def _create_rank(
+    def create_ranks(
+        self, data: pd.DataFrame, metrics: List[str] = None, by_player: bool = False
+    ) -> Dict[str, pd.DataFrame]:
+        """`create_rank` (or `create_player_rank`) for every metric, aggregating once"""
+        aggregated, prev_aggregated = self._aggregate(
+            data, self._prev_for_players if by_player else self._prev_for_teams
+        )
+        return {
+            metric: self._rank(aggregated.copy(), prev_aggregated, metric)
+            for metric in metrics or self.METRICS
+        }
+
+    def _aggregate(
         self,
         data: pd.DataFrame,
-        metric_to_use: str,
         prev_f: Callable[[pd.DataFrame], Tuple[pd.DataFrame, pd.DataFrame]],
-    ) -> pd.DataFrame:
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Metric totals per player over the current window and the previous one"""
         data, prev_data = prev_f(data)
-        data["squad"] = data["decorated_name"]
-        prev_data["squad"] = prev_data["decorated_name"]
-        aggregated = (
-            data.groupby(["player", "domestic league", "squad"])
-            .agg(
-                {
-                    "defending": "sum",
-                    "finishing": "sum",
-                    "progressing": "sum",
-                    "providing": "sum",
-                    "keeping": "sum",
-                    "total": "sum",
-                    "rank_position": "first",
-                }
-            )
-            .reset_index()
-        )
-        prev_aggregated = (
-            prev_data.groupby(["player", "domestic league", "squad"])
-            .agg(
-                {
-                    "defending": "sum",
-                    "finishing": "sum",
-                    "progressing": "sum",
-                    "providing": "sum",
-                    "keeping": "sum",
-                    "total": "sum",
-                    "rank_position": "first",
-                }
-            )
+        aggregations = {metric: "sum" for metric in self.METRICS}
+        aggregations["rank_position"] = "first"
+        aggregated, prev_aggregated = [
+            frame.assign(squad=frame["decorated_name"])
+            .groupby(["player", "domestic league", "squad"])
+            .agg(aggregations)
             .reset_index()
-        )
+            for frame in (data, prev_data)
+        ]
         for c in [
             "finishing",
             "defending",
@@ -226,42 +193,42 @@ class PowerRank:
             aggregated[f"{c}_r"] = aggregated[c].rank(pct=True, method="dense") * 100
         aggregated["is_keeper"] = aggregated["rank_position"] == "GK"
         aggregated = aggregated.drop(labels=["rank_position"], axis=1)
-        aggregated["Percentile Rank (Overall)"] = (
-            aggregated[metric_to_use].rank(pct=True) * 100
-        )
-        aggregated["Rank (Overall)"] = aggregated[metric_to_use].rank(ascending=False)
-        prev_aggregated["Rank (Overall)"] = prev_aggregated[metric_to_use].rank(
-            ascending=False
+        return aggregated, prev_aggregated
+
+    def _rank(
+        self,
+        aggregated: pd.DataFrame,
+        prev_aggregated: pd.DataFrame,
+        metric_to_use: str,
+    ) -> pd.DataFrame:
+        metric = aggregated[metric_to_use]
+        aggregated["Percentile Rank (Overall)"] = metric.rank(pct=True) * 100
+        aggregated["Rank (Overall)"] = metric.rank(ascending=False)
+        by_league = metric.groupby(aggregated["domestic league"])
+        aggregated["Percentile Rank (League)"] = by_league.rank(pct=True) * 100
+        by_squad = metric.groupby(aggregated["squad"])
+        aggregated["Rank (Team)"] = by_squad.rank(ascending=False)
+        aggregated["PCT Rank (Team)"] = by_squad.rank(pct=True) * 100
+        prev_rank = (
+            prev_aggregated.set_index(["player", "squad"])[metric_to_use]
+            .rank(ascending=False)
+            .reindex(pd.MultiIndex.from_frame(aggregated[["player", "squad"]]))
         )
-        for i, g in aggregated.groupby("domestic league"):
-            aggregated.loc[
-                aggregated["domestic league"] == i, "Percentile Rank (League)"
-            ] = (g[metric_to_use].rank(pct=True) * 100)
-
-        for i, g in aggregated.groupby("squad"):
-            aggregated.loc[aggregated["squad"] == i, "Rank (Team)"] = g[
-                metric_to_use
-            ].rank(ascending=False)
-            aggregated.loc[aggregated["squad"] == i, "PCT Rank (Team)"] = (
-                g[metric_to_use].rank(pct=True) * 100
-            )
         aggregated["Rank Change"] = (
-            pd.merge(
-                left=aggregated,
-                right=prev_aggregated,
-                on=["player", "squad"],
-                how="left",
-            )["Rank (Overall)_y"]
-            - pd.merge(
-                left=aggregated,
-                right=prev_aggregated,
-                on=["player", "squad"],
-                how="left",
-            )["Rank (Overall)_x"]
+            prev_rank.to_numpy() - aggregated["Rank (Overall)"].to_numpy()
         )
 
         return aggregated.sort_values(metric_to_use, ascending=False)
 
+    def _create_rank(
+        self,
+        data: pd.DataFrame,
+        metric_to_use: str,
+        prev_f: Callable[[pd.DataFrame], Tuple[pd.DataFrame, pd.DataFrame]],
+    ) -> pd.DataFrame:
+        aggregated, prev_aggregated = self._aggregate(data, prev_f)
+        return self._rank(aggregated, prev_aggregated, metric_to_use)
+
     @staticmethod
     def rank_formatter(v):
         if v < 10:
@@ -0,0 +1,114 @@
+import os
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from fb_viz.helpers.cache_dirs import default_cache_dir
+
+
+class RankHistory:
+    """Each player's overall, league and team rank per metric and gameweek, kept on disk.
+
+    Ranks are recorded from `PowerRank.create_rank` tables, so a rank change against
+    any earlier gameweek is a lookup on (metric, week, player, squad) rather than a
+    re-aggregation of that week's window::
+
+        history = RankHistory("2023_5_team")
+        history.record(power_rank.create_rank(data, "total"), "total", week)
+        table = history.rank_change(table, "total", since=earlier_week)
+
+    Gameweeks are the Monday of the week of each window's latest match, see `week_of`.
+    """
+
+    KEYS = ["metric", "week", "player", "squad"]
+    RANKS = ["rank_overall", "rank_league", "rank_team"]
+
+    def __init__(self, name: str, path: str = None):
+        self.path = path or os.path.join(
+            default_cache_dir("powerrank"), f"{name}_history.pkl"
+        )
+        self.table = (
+            pd.read_pickle(self.path)
+            if os.path.exists(self.path)
+            else pd.DataFrame(columns=self.KEYS + self.RANKS)
+        )
+
+    @staticmethod
+    def week_of(date) -> pd.Timestamp:
+        return pd.Timestamp(date).to_period("W").start_time
+
+    def weeks(self, metric: str) -> List[pd.Timestamp]:
+        weeks = self.table.loc[self.table["metric"] == metric, "week"].unique()
+        return sorted(pd.Timestamp(w) for w in weeks)
+
+    def record(self, ranked: pd.DataFrame, metric: str, week) -> "RankHistory":
+        """Store the ranks in a `create_rank` table for `metric`, replacing any already
+        recorded for that week"""
+        return self.record_many({metric: ranked}, week)
+
+    def record_many(self, ranks: Dict[str, pd.DataFrame], week) -> "RankHistory":
+        """`record` for several metrics, as returned by `PowerRank.create_ranks`, with a
+        single rewrite of the table and the file"""
+        week = self.week_of(week)
+        rows = [
+            pd.DataFrame(
+                {
+                    "metric": metric,
+                    "week": week,
+                    "player": ranked["player"].to_numpy(),
+                    "squad": ranked["squad"].to_numpy(),
+                    "rank_overall": ranked["Rank (Overall)"].to_numpy(),
+                    "rank_league": ranked[metric]
+                    .groupby(ranked["domestic league"])
+                    .rank(ascending=False)
+                    .to_numpy(),
+                    "rank_team": ranked["Rank (Team)"].to_numpy(),
+                }
+            )
+            for metric, ranked in ranks.items()
+        ]
+        table = self.table.loc[
+            ~self.table["metric"].isin(list(ranks)) | (self.table["week"] != week)
+        ]
+        table = pd.concat([table] + rows, ignore_index=True)
+        for c in ["metric", "player", "squad"]:
+            table[c] = table[c].astype("category")
+        table["week"] = pd.to_datetime(table["week"])
+        table[self.RANKS] = table[self.RANKS].astype(np.float32)
+        self.table = table
+        self.save()
+        return self
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        self.table.to_pickle(tmp_path)
+        os.replace(tmp_path, self.path)
+
+    def ranks(self, metric: str, week) -> pd.DataFrame:
+        """Recorded ranks for `metric` in `week`, indexed by (player, squad)"""
+        week = self.week_of(week)
+        rows = self.table.loc[
+            (self.table["metric"] == metric) & (self.table["week"] == week)
+        ]
+        return (
+            rows.astype({"player": object, "squad": object})
+            .set_index(["player", "squad"])[self.RANKS]
+            .astype(float)
+        )
+
+    def rank_change(self, ranked: pd.DataFrame, metric: str, since) -> pd.DataFrame:
+        """`ranked` with `Rank Change` measured against the overall rank recorded for
+        `since` instead of the previous window"""
+        if self.week_of(since) not in self.weeks(metric):
+            raise KeyError(
+                f"No {metric!r} ranks recorded for the week of {since}, "
+                f"recorded weeks are {[str(w.date()) for w in self.weeks(metric)]}"
+            )
+        previous = self.ranks(metric, since)["rank_overall"].reindex(
+            pd.MultiIndex.from_frame(ranked[["player", "squad"]])
+        )
+        return ranked.assign(
+            **{"Rank Change": previous.to_numpy() - ranked["Rank (Overall)"].to_numpy()}
+        )